@@ -1,9 +1,13 @@
 from typing import Optional, Callable, Any, Dict, List
 from pathlib import Path
+from functools import lru_cache
+import asyncio
+import inspect
 import logging
 
 # 导入基础语言模型基类（用于后续扩展）
 from langchain_core.language_models import BaseChatModel
+from langchain_core.tools import BaseTool
 
 # LangChain 1.0 正确导入方式
 from langchain.agents import create_agent
@@ -14,41 +18,107 @@ from core import SkillRegistry, SkillState, SkillMetadata
 from core.state import SkillStateAccumulative, SkillStateFIFO
 from middleware import SkillMiddleware
 from config import SkillSystemConfig, load_config
-from utils import setup_logger, generate_system_prompt
+from utils import setup_logger, generate_system_prompt, BatchingAgentProxy
 
 logger = logging.getLogger(__name__)
 
+# 导入时一次性探测 create_agent 支持的参数，避免每次构建时 try/except 回退
+_CREATE_AGENT_PARAMS = frozenset(inspect.signature(create_agent).parameters)
+logger.debug(
+    "create_agent supports: "
+    + ", ".join(p for p in ("middleware", "state_schema", "debug") if p in _CREATE_AGENT_PARAMS)
+)
+
 class SkillAgent:
     """
     Skill Agent 包装器
 
     封装了 Agent 和 Registry，提供便捷的管理接口
+
+    Note:
+        SkillAgent 本身不是协程安全的状态容器：abatch 并发的是彼此独立的输入，
+        如需多个互不干扰的 Agent 并发运行，请分别创建实例。
     """
 
     def __init__(
         self,
         agent: Any,
         registry: SkillRegistry,
-        config: SkillSystemConfig
+        config: SkillSystemConfig,
+        available_skills: Optional[List[str]] = None
     ):
         """
         Args:
             agent: LangChain Agent 实例
             registry: Skill Registry
             config: 系统配置
+            available_skills: 通过可见性/filter_fn 过滤后交给 Agent 的 Skill 名称（None 表示全部）
         """
         self.agent = agent
         self.registry = registry
         self.config = config
+        self._available_skills = frozenset(available_skills) if available_skills is not None else None
+        # 微批处理代理：后台线程在首次 invoke_batched 时才启动
+        self._batcher = BatchingAgentProxy(
+            agent,
+            window=config.batch_window,
+            max_batch_size=config.max_batch_size
+        )
 
     def invoke(self, input_data: Dict[str, Any], **kwargs) -> Any:
         """调用 Agent"""
         return self.agent.invoke(input_data, **kwargs)
 
+    def invoke_batched(self, input_data: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """
+        调用 Agent，并与时间窗口内其他线程的调用合并为一次 batch
+
+        适合多个会话/线程共享同一个 SkillAgent 的场景；单个调用者会多等待
+        最多 config.batch_window 秒。
+
+        Args:
+            input_data: 与 invoke 相同的输入
+            timeout: 等待结果的最长秒数（None 表示一直等待）
+
+        Returns:
+            该输入对应的结果
+        """
+        return self._batcher.invoke(input_data, timeout)
+
     async def ainvoke(self, input_data: Dict[str, Any], **kwargs) -> Any:
         """异步调用 Agent"""
         return await self.agent.ainvoke(input_data, **kwargs)
 
+    async def abatch(
+        self,
+        inputs: List[Dict[str, Any]],
+        concurrency: int = 8,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> List[Any]:
+        """
+        并发调用 Agent 处理多个输入
+
+        Args:
+            inputs: 输入列表（每项与 ainvoke 的 input_data 相同）
+            concurrency: 最大并发数
+            return_exceptions: 为 True 时以异常对象代替抛出
+            **kwargs: 传递给每次 ainvoke 的参数
+
+        Returns:
+            与 inputs 顺序一致的结果列表
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(input_data: Dict[str, Any]) -> Any:
+            async with semaphore:
+                return await self.agent.ainvoke(input_data, **kwargs)
+
+        return await asyncio.gather(
+            *(_one(input_data) for input_data in inputs),
+            return_exceptions=return_exceptions
+        )
+
     def stream(self, input_data: Dict[str, Any], **kwargs):
         """流式调用 Agent"""
         return self.agent.stream(input_data, **kwargs)
@@ -61,6 +131,12 @@ class SkillAgent:
         """列出所有已注册的 Skills"""
         return self.registry.list_skills()
 
+    def get_tool(self, skill_name: str) -> Optional[BaseTool]:
+        """获取 Agent 可用的工具；被可见性或 filter_fn 过滤掉的 Skill 返回 None"""
+        if self._available_skills is not None and skill_name not in self._available_skills:
+            return None
+        return self.registry.get_tool(skill_name)
+
     def get_skill_info(self, skill_name: str) -> SkillMetadata:
         """获取 Skill 信息"""
         return self.registry.get_metadata(skill_name)
@@ -123,11 +199,75 @@ def create_skill_agent(
     "messages": [{"role": "user", "content": "Convert PDF to CSV"}]
     })
     ```
+
+    Note:
+        相同 (config 内容, model 实例, custom_system_prompt, filter_fn) 的重复调用
+        会复用已构建的 SkillAgent（LRU 缓存）。Skills 目录内容变更后需调用
+        `create_skill_agent.cache_clear()` 使缓存失效。
     """
     # 1. 加载配置
     if config is None:
         config = load_config(config_path)
 
+    return _build_skill_agent_cached(
+        config,
+        _CacheKey(id(model), model),
+        custom_system_prompt,
+        filter_fn,
+    )
+
+
+def _compile_filter(
+    config: SkillSystemConfig,
+    filter_fn: Optional[Callable[[SkillMetadata], bool]] = None
+) -> Optional[Callable[[SkillMetadata], bool]]:
+    """
+    将可见性过滤与自定义过滤函数组合为单个谓词
+
+    Returns:
+        组合后的过滤函数；不需要任何过滤时返回 None
+    """
+    predicates: List[Callable[[SkillMetadata], bool]] = []
+    if config.filter_by_visibility:
+        allowed = frozenset(config.allowed_visibilities)
+        predicates.append(lambda meta: meta.visibility in allowed)
+    if filter_fn:
+        predicates.append(filter_fn)
+
+    if not predicates:
+        return None
+    if len(predicates) == 1:
+        return predicates[0]
+
+    predicates = tuple(predicates)
+    return lambda meta: all(pred(meta) for pred in predicates)
+
+
+class _CacheKey:
+    """按 key 参与哈希/比较，同时携带原始对象穿过 lru_cache"""
+    __slots__ = ("key", "value")
+
+    def __init__(self, key: Any, value: Any):
+        self.key = key
+        self.value = value
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _CacheKey) and self.key == other.key
+
+
+@lru_cache(maxsize=32)
+def _build_skill_agent_cached(
+    config: SkillSystemConfig,
+    model_key: _CacheKey,
+    custom_system_prompt: Optional[str],
+    filter_fn: Optional[Callable[[SkillMetadata], bool]],
+) -> SkillAgent:
+    """构建 SkillAgent（结果按配置内容与模型实例缓存）"""
+    model: BaseChatModel = model_key.value
+
     # 2. 设置日志
     if config.verbose:
         setup_logger(level=config.log_level)
@@ -142,7 +282,8 @@ def create_skill_agent(
         logger.info(f"Auto-discovering skills from: {config.skills_dir}")
         loaded_count = registry.discover_and_load(
             skills_dir=config.skills_dir,
-            module_name=config.skill_module_name
+            module_name=config.skill_module_name,
+            lazy=config.lazy_load
         )
         logger.info(f"Loaded {loaded_count} skills")
     else:
@@ -151,18 +292,8 @@ def create_skill_agent(
     if len(registry) == 0:
         logger.warning("No skills loaded! Agent will have no skill capabilities.")
     
-    # 5. 定义过滤函数（基于可见性）
-    def visibility_filter(meta: SkillMetadata) -> bool:
-        if not config.filter_by_visibility:
-            return True
-        return meta.visibility in config.allowed_visibilities
-
-    # 组合用户自定义过滤函数
-    combined_filter = filter_fn
-    if filter_fn:
-        combined_filter = lambda meta: visibility_filter(meta) and filter_fn(meta)
-    else:
-        combined_filter = visibility_filter
+    # 5. 组合过滤函数（可见性 + 用户自定义），无需过滤时为 None
+    combined_filter = _compile_filter(config, filter_fn)
     
     # 6. 获取所有工具（用于注册到 Agent）
     all_tools = registry.get_all_tools(filter_fn=combined_filter)
@@ -180,64 +311,78 @@ def create_skill_agent(
 
     logger.info(f"Using state mode: {config.state_mode}")
 
-    # 8. 创建中间件列表
+    # 8. 计算过滤后的 Skill 列表（System Prompt 与中间件共用）
+    available_skills = registry.list_skills(filter_fn=combined_filter)
+
+    # 创建中间件列表
     middleware_list: List[AgentMiddleware] = []
 
+    if config.enable_tool_selector:
+        # 每轮先由 LLM 挑选最相关的工具，只把 top-K 工具的 schema 发给主模型
+        try:
+            from langchain.agents.middleware import LLMToolSelectorMiddleware
+        except ImportError:
+            logger.warning("LLMToolSelectorMiddleware unavailable in this LangChain version - tool selector disabled")
+        else:
+            middleware_list.append(LLMToolSelectorMiddleware(max_tools=config.max_tools_per_turn))
+            logger.info(f"Tool selector enabled - at most {config.max_tools_per_turn} tools per turn")
+
     if config.middleware_enabled:
         # 【核心】创建 SkillMiddleware 实现动态工具过滤
         skill_middleware = SkillMiddleware(
             skill_registry=registry,
             verbose=config.verbose,
-            filter_fn=combined_filter
+            filter_fn=combined_filter,
+            precomputed_tools=all_tools,
+            precomputed_skill_names=available_skills
         )
         middleware_list.append(skill_middleware)
         logger.info("SkillMiddleware enabled - dynamic tool filtering active")
 
     # 9. 生成 System Prompt
-    available_skills = registry.list_skills(filter_fn=combined_filter)
     system_prompt = custom_system_prompt or generate_system_prompt(
         available_skill_names=available_skills,
-        custom_instructions=""
+        custom_instructions="",
+        # accumulate/fifo 状态的 messages 没有 reducer，同一步内多个工具结果会触发
+        # InvalidUpdateError，因此只在 replace 模式下提示模型并行调用工具
+        parallel_tool_calls=config.parallel_tool_calls and config.state_mode == "replace"
     )
 
     logger.debug(f"System prompt:\n{system_prompt}")
 
     # 10. 创建 LangChain 1.0 Agent
-    # 使用 langchain.agents.create_agent，支持 middleware 和 state_schema
-    try:
-        agent = create_agent(
-            model=model,
-            tools=all_tools,
-            middleware=middleware_list if middleware_list else (),
-            state_schema=state_schema,           # 正确的参数名
-            system_prompt=system_prompt,
-            debug=config.verbose
-        )
+    # 使用 langchain.agents.create_agent，只传入当前版本支持的参数
+    candidate_kwargs = {
+        "model": model,
+        "tools": all_tools,
+        "middleware": middleware_list if middleware_list else (),
+        "state_schema": state_schema,           # 正确的参数名
+        "system_prompt": system_prompt,
+        "debug": config.verbose,
+    }
+    agent = create_agent(**{
+        key: value for key, value in candidate_kwargs.items() if key in _CREATE_AGENT_PARAMS
+    })
+
+    if "middleware" not in _CREATE_AGENT_PARAMS:
+        logger.warning("Agent created without middleware - dynamic filtering disabled!")
+    elif "state_schema" not in _CREATE_AGENT_PARAMS:
+        logger.info("Agent created with middleware support (no state_schema)")
+    else:
         logger.info("Agent created with middleware and state_schema support")
-    except TypeError as e:
-        # 如果某些参数不支持，尝试简化版本
-        logger.warning(f"Falling back to simplified agent creation: {e}")
-        try:
-            agent = create_agent(
-                model=model,
-                tools=all_tools,
-                middleware=middleware_list if middleware_list else (),
-                system_prompt=system_prompt,
-            )
-            logger.info("Agent created with middleware support (no state_schema)")
-        except TypeError:
-            # 最后回退：不使用中间件
-            agent = create_agent(
-                model=model,
-                tools=all_tools,
-                system_prompt=system_prompt,
-            )
-            logger.warning("Agent created without middleware - dynamic filtering disabled!")
 
     logger.info("Skill Agent created successfully")
 
     # 11. 返回封装的 SkillAgent
-    return SkillAgent(agent=agent, registry=registry, config=config)
+    return SkillAgent(
+        agent=agent,
+        registry=registry,
+        config=config,
+        available_skills=available_skills
+    )
+
+
+create_skill_agent.cache_clear = _build_skill_agent_cached.cache_clear
 
 
     # 【可选】便捷创建函数（供外部调用）
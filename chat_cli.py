@@ -10,12 +10,26 @@ import asyncio
 # Add current directory to path and import with hyphenated module name
 sys.path.insert(0, str(Path(__file__).parent))
 import importlib.util
-spec = importlib.util.spec_from_file_location("long_term_memory", Path(__file__).parent / "long-term-memory.py")
-long_term_memory = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(long_term_memory)
+from functools import cache
+
+# Shared persistent event loop for store access (keeps the store client's connections alive)
+from utils import reply_chunk_text, run_async
+
+
+@cache
+def _load_ltm():
+    """Import long-term-memory.py once; the agent and store it creates are reused"""
+    spec = importlib.util.spec_from_file_location("long_term_memory", Path(__file__).parent / "long-term-memory.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+long_term_memory = _load_ltm()
 agent = long_term_memory.agent
 store = long_term_memory.store
 
+
 def print_header():
     """Print welcome header"""
     print("\n" + "="*60)
@@ -60,10 +74,7 @@ def list_memories():
                 print(f"Search error: {e}")
                 return []
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        keys = loop.run_until_complete(_list())
-        loop.close()
+        keys = run_async(_list())
         
         if keys:
             print(f"\n📚 Found {len(keys)} memory item(s):\n")
@@ -84,19 +95,18 @@ def view_memory(key):
                 key if key.startswith("/") else f"/memories/{key}",
                 key
             ]
-            for full_key in key_variants:
-                try:
-                    value = await store.aget(full_key)
-                    if value is not None:
-                        return value
-                except Exception:
-                    continue
+            # Look up all variants concurrently; first hit in variant order wins
+            results = await asyncio.gather(
+                *(store.aget(("memories",), full_key) for full_key in key_variants),
+                return_exceptions=True
+            )
+            for item in results:
+                if item is not None and not isinstance(item, Exception):
+                    # Store returns an Item wrapper; return its payload
+                    return getattr(item, "value", item)
             return None
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        value = loop.run_until_complete(_get())
-        loop.close()
+        value = run_async(_get())
         
         if value is not None:
             print(f"\n📄 Memory: {key}\n")
@@ -111,6 +121,22 @@ def view_memory(key):
     except Exception as e:
         print(f"\n❌ Error reading memory: {e}\n")
 
+async def stream_reply(user_input, config):
+    """Stream the agent's reply to stdout token by token and return the full text"""
+    chunks = []
+    async for message, metadata in agent.astream(
+        {"messages": [{"role": "user", "content": user_input}]},
+        config=config,
+        stream_mode="messages"
+    ):
+        # Only print the top-level model's reply (skip tool calls, tool results and subagents)
+        text = reply_chunk_text(message, metadata)
+        if text:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            chunks.append(text)
+    return "".join(chunks)
+
 def chat_loop():
     """Main chat loop"""
     thread_id = str(uuid.uuid4())
@@ -163,16 +189,9 @@ def chat_loop():
             # Process user message
             print("\n🤖 Agent: ", end="", flush=True)
             
-            # Invoke agent
-            result = agent.invoke(
-                {"messages": [{"role": "user", "content": user_input}]},
-                config=config
-            )
-            
-            # Get and display response
-            response = result["messages"][-1].content
-            print(response)
-            print()
+            # Stream agent response as it is generated
+            response = run_async(stream_reply(user_input, config))
+            print("\n")
             
             # Store in conversation history
             messages.append({"role": "user", "content": user_input})
@@ -11,9 +11,21 @@ import asyncio
 # Add current directory to path and import with hyphenated module name
 sys.path.insert(0, str(Path(__file__).parent))
 import importlib.util
-spec = importlib.util.spec_from_file_location("long_term_memory", Path(__file__).parent / "long-term-memory.py")
-long_term_memory = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(long_term_memory)
+
+# One process-wide event loop shared by every browser session (store access, agent streaming)
+from utils import iter_async, render_stream, reply_chunk_text, run_async
+
+
+@st.cache_resource(show_spinner=False)
+def _load_ltm():
+    """Import long-term-memory.py once; the agent and store it creates are reused"""
+    spec = importlib.util.spec_from_file_location("long_term_memory", Path(__file__).parent / "long-term-memory.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+long_term_memory = _load_ltm()
 agent = long_term_memory.agent
 store = long_term_memory.store
 
@@ -33,6 +45,63 @@ if "thread_id" not in st.session_state:
 if "config" not in st.session_state:
     st.session_state.config = {"configurable": {"thread_id": st.session_state.thread_id}}
 
+
+def stream_response(prompt):
+    """Yield the agent's reply token by token, driving its async stream on the shared loop"""
+    stream = agent.astream(
+        {"messages": [{"role": "user", "content": prompt}]},
+        config=st.session_state.config,
+        stream_mode="messages"
+    )
+    
+    for message, metadata in iter_async(stream):
+        # Only render the top-level model's reply (skip tool calls, tool results and subagents)
+        text = reply_chunk_text(message, metadata)
+        if text:
+            yield text
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_all_memories():
+    """List every key in the /memories namespace and fetch the values concurrently"""
+    async def fetch_all():
+        # namespace_prefix must be a tuple: ("memories",) for /memories/
+        try:
+            results = await store.asearch(("memories",), query=None, limit=100)
+        except Exception:
+            # Return empty listing if search fails
+            return {}
+        
+        # Extract keys from search results
+        keys = []
+        for result in results or []:
+            # SearchItem has a 'key' attribute
+            if hasattr(result, 'key'):
+                keys.append(result.key)
+            elif hasattr(result, 'id'):
+                keys.append(result.id)
+            elif isinstance(result, dict):
+                keys.append(result.get('key', result.get('id', str(result))))
+            else:
+                keys.append(str(result))
+        
+        # Fetch all values concurrently, bounded to respect store limits
+        semaphore = asyncio.Semaphore(8)
+        
+        async def get_memory(key):
+            async with semaphore:
+                item = await store.aget(("memories",), key)
+            # Store returns an Item wrapper; keep its payload
+            return getattr(item, "value", item)
+        
+        values = await asyncio.gather(
+            *(get_memory(key) for key in keys),
+            return_exceptions=True
+        )
+        return dict(zip(keys, values))
+    
+    return run_async(fetch_all())
+
 # Sidebar
 with st.sidebar:
     st.title("🤖 DeepAgent Chat")
@@ -56,53 +125,19 @@ with st.sidebar:
     if st.button("🔍 Inspect Memories", use_container_width=True):
         with st.spinner("Loading memories..."):
             try:
-                async def list_memories():
-                    # Use asearch to find all keys in the /memories namespace
-                    # namespace_prefix must be a tuple: ("memories",) for /memories/
-                    try:
-                        results = await store.asearch(("memories",), query=None, limit=100)
-                        # Extract keys from search results
-                        keys = []
-                        if results:
-                            for result in results:
-                                # SearchItem has a 'key' attribute
-                                if hasattr(result, 'key'):
-                                    keys.append(result.key)
-                                elif hasattr(result, 'id'):
-                                    keys.append(result.id)
-                                elif isinstance(result, dict):
-                                    keys.append(result.get('key', result.get('id', str(result))))
-                                else:
-                                    keys.append(str(result))
-                        return keys
-                    except Exception as e:
-                        # Return empty list if search fails
-                        return []
-                
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                keys = loop.run_until_complete(list_memories())
-                loop.close()
+                memories = _load_all_memories()
                 
-                if keys:
-                    st.success(f"Found {len(keys)} memory item(s)")
-                    for key in keys:
+                if memories:
+                    st.success(f"Found {len(memories)} memory item(s)")
+                    for key, value in memories.items():
                         with st.expander(f"📄 {key}"):
-                            try:
-                                async def get_memory(key):
-                                    return await store.aget(key)
-                                
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                                value = loop.run_until_complete(get_memory(key))
-                                loop.close()
-                                
-                                if isinstance(value, (str, bytes)):
-                                    st.text(str(value)[:1000])
-                                else:
-                                    st.json(value)
-                            except Exception as e:
-                                st.error(f"Error reading: {e}")
+                            if isinstance(value, Exception):
+                                st.error(f"Error reading: {value}")
+                                continue
+                            if isinstance(value, (str, bytes)):
+                                st.text(str(value)[:1000])
+                            else:
+                                st.json(value)
                 else:
                     st.info("No memories found")
             except Exception as e:
@@ -138,27 +173,19 @@ if prompt := st.chat_input("Ask a question..."):
     
     # Get agent response
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            try:
-                # Invoke agent
-                result = agent.invoke(
-                    {"messages": [{"role": "user", "content": prompt}]},
-                    config=st.session_state.config
-                )
-                
-                # Get response
-                response = result["messages"][-1].content
-                
-                # Display response
-                st.markdown(response)
-                
-                # Add assistant response to chat
-                st.session_state.messages.append({"role": "assistant", "content": response})
-                
-            except Exception as e:
-                error_msg = f"Error: {str(e)}"
-                st.error(error_msg)
-                st.session_state.messages.append({"role": "assistant", "content": error_msg})
+        try:
+            # Stream agent response as it is generated
+            response = render_stream(stream_response(prompt))
+            # The agent may have written memories during this turn
+            _load_all_memories.clear()
+            
+            # Add assistant response to chat
+            st.session_state.messages.append({"role": "assistant", "content": response})
+            
+        except Exception as e:
+            error_msg = f"Error: {str(e)}"
+            st.error(error_msg)
+            st.session_state.messages.append({"role": "assistant", "content": error_msg})
 
 # Footer
 st.markdown("---")
@@ -1,18 +1,25 @@
 """
 Configuration module for Skill System
 """
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields
 import json
 import logging
+import os
+
+try:
+    import orjson
+except ImportError:
+    # orjson 不可用时使用标准库 json
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SkillSystemConfig:
-    """Configuration for Skill System"""
+    """Configuration for Skill System (immutable, hashable and slotted)"""
     
     # Directory settings
     skills_dir: Path = field(default_factory=lambda: Path("./skills"))
@@ -23,13 +30,16 @@ class SkillSystemConfig:
     
     # Discovery settings
     auto_discover: bool = True
+    lazy_load: bool = False  # Opt-in: defer importing skill modules until first tool use
     
     # Filtering settings
     filter_by_visibility: bool = True
-    allowed_visibilities: List[str] = field(default_factory=lambda: ["public"])
+    allowed_visibilities: Tuple[str, ...] = ("public",)
     
     # Middleware settings
     middleware_enabled: bool = True
+    enable_tool_selector: bool = False  # LLM pre-selects relevant tools each turn
+    max_tools_per_turn: int = 7
     
     # Logging settings
     verbose: bool = False
@@ -37,12 +47,22 @@ class SkillSystemConfig:
     
     # Performance settings
     max_concurrent_skills: int = 5
+    parallel_tool_calls: bool = True  # Prompt the model to batch independent tool calls ("replace" state mode only)
+    batch_window: float = 0.2  # Seconds invoke_batched() waits to coalesce concurrent calls
+    max_batch_size: int = 16  # Maximum inputs per coalesced agent.batch() call
+    
+    # Precomputed to_dict() result
+    _dict_cache: Dict[str, Any] = field(init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Post-initialization processing"""
         # Ensure skills_dir is a Path object
         if isinstance(self.skills_dir, str):
-            self.skills_dir = Path(self.skills_dir)
+            object.__setattr__(self, "skills_dir", Path(self.skills_dir))
+        
+        # Store visibilities as a tuple so the config stays hashable
+        if not isinstance(self.allowed_visibilities, tuple):
+            object.__setattr__(self, "allowed_visibilities", tuple(self.allowed_visibilities))
         
         # Validate state_mode
         valid_modes = ["replace", "accumulate", "fifo"]
@@ -50,13 +70,17 @@ class SkillSystemConfig:
             raise ValueError(
                 f"state_mode must be one of {valid_modes}, got {self.state_mode}"
             )
+        
+        dict_cache = {
+            f.name: getattr(self, f.name) for f in fields(self) if f.init
+        }
+        # Convert Path to string for JSON serialization
+        dict_cache["skills_dir"] = str(self.skills_dir)
+        object.__setattr__(self, "_dict_cache", dict_cache)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        result = asdict(self)
-        # Convert Path to string for JSON serialization
-        result["skills_dir"] = str(self.skills_dir)
-        return result
+        return self._dict_cache.copy()
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "SkillSystemConfig":
@@ -68,28 +92,70 @@ class SkillSystemConfig:
     
     def to_json(self) -> str:
         """Convert to JSON string"""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2).decode()
         return json.dumps(self.to_dict(), indent=2)
     
     @classmethod
     def from_json(cls, json_str: str) -> "SkillSystemConfig":
         """Create from JSON string"""
-        data = json.loads(json_str)
+        data = orjson.loads(json_str) if orjson is not None else json.loads(json_str)
         return cls.from_dict(data)
     
     def save(self, path: Path) -> None:
         """Save configuration to file"""
-        with open(path, "w") as f:
-            f.write(self.to_json())
+        if orjson is not None:
+            with open(path, "wb") as f:
+                f.write(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2))
+        else:
+            with open(path, "w") as f:
+                f.write(self.to_json())
         logger.info(f"Saved configuration to {path}")
     
     @classmethod
     def load(cls, path: Path) -> "SkillSystemConfig":
         """Load configuration from file"""
-        with open(path, "r") as f:
-            data = json.load(f)
+        if orjson is not None:
+            with open(path, "rb") as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(path, "r") as f:
+                data = json.load(f)
         return cls.from_dict(data)
 
 
+def _default_config_path() -> Optional[Path]:
+    """Return the first existing default configuration file, relative to the current directory"""
+    default_paths = [
+        Path("skill_config.json"),
+        Path(".skill_config.json"),
+        Path("config/skill_config.json")
+    ]
+    for path in default_paths:
+        if path.exists():
+            return path
+    return None
+
+
+# Parsed configuration files: absolute path -> (mtime, config)
+_config_cache: Dict[str, Tuple[float, SkillSystemConfig]] = {}
+
+
+def _load_cached(path: Path) -> SkillSystemConfig:
+    """Load a configuration file, re-parsing only when its mtime changes"""
+    mtime = path.stat().st_mtime
+    # Absolute key: the same relative path names a different file after a chdir
+    key = os.path.abspath(path)
+    cached = _config_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    logger.info(f"Loading configuration from {path}")
+    config = SkillSystemConfig.load(path)
+    _config_cache[key] = (mtime, config)
+    return config
+
+
 def load_config(config_path: Optional[Path] = None) -> SkillSystemConfig:
     """
     Load configuration from file or return default
@@ -99,30 +165,34 @@ def load_config(config_path: Optional[Path] = None) -> SkillSystemConfig:
     
     Returns:
         SkillSystemConfig instance
+    
+    Note:
+        Parsed files are cached and re-read only when their mtime changes.
+        Call `load_config.cache_clear()` to drop the cache (e.g. in tests).
     """
     if config_path is None:
         # Try default locations
-        default_paths = [
-            Path("skill_config.json"),
-            Path(".skill_config.json"),
-            Path("config/skill_config.json")
-        ]
-        
-        for path in default_paths:
-            if path.exists():
-                logger.info(f"Loading configuration from {path}")
-                return SkillSystemConfig.load(path)
+        path = _default_config_path()
+        if path is not None:
+            return _load_cached(path)
         
         # Return default config
         logger.info("Using default configuration")
         return SkillSystemConfig()
     
-    if config_path.exists():
-        logger.info(f"Loading configuration from {config_path}")
-        return SkillSystemConfig.load(config_path)
-    else:
+    try:
+        return _load_cached(config_path)
+    except FileNotFoundError:
         logger.warning(f"Configuration file not found: {config_path}, using defaults")
         return SkillSystemConfig()
 
 
+def _clear_config_cache() -> None:
+    """Drop cached configuration files"""
+    _config_cache.clear()
+
+
+load_config.cache_clear = _clear_config_cache
+
+
 __all__ = ["SkillSystemConfig", "load_config"]
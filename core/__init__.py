@@ -2,17 +2,31 @@
 Core module for Skill System
 Contains SkillRegistry, SkillState, and SkillMetadata
 """
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from pathlib import Path
+from types import ModuleType
+from functools import lru_cache, partial, wraps
 import importlib.util
+from importlib.machinery import ModuleSpec
+from concurrent.futures import ThreadPoolExecutor
+import json
 import logging
-from dataclasses import dataclass, field
+import os
+import pkgutil
+import threading
+import time
+from dataclasses import asdict, dataclass, field, replace
 from langchain_core.tools import BaseTool
 
+from .lazy import LazyTool, scan_skill_file
+
 logger = logging.getLogger(__name__)
 
+# Import eagerly loaded skill modules on a thread pool from this many modules on
+_PARALLEL_LOAD_THRESHOLD = 4
+
 
-@dataclass
+@dataclass(slots=True)
 class SkillMetadata:
     """Metadata for a skill"""
     name: str
@@ -22,23 +36,62 @@ class SkillMetadata:
     version: str = "1.0.0"
     author: str = ""
     dependencies: List[str] = field(default_factory=list)
+    cacheable: bool = False  # Deterministic tool: cache results by arguments
+    cache_ttl: Optional[int] = None  # Seconds; None caches for the process lifetime
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "tags": self.tags,
-            "visibility": self.visibility,
-            "version": self.version,
-            "author": self.author,
-            "dependencies": self.dependencies
-        }
+        return asdict(self)
+
+
+def _fresh(result: Any) -> Any:
+    """Shallow copy of a mutable container result, so a cached value is never shared"""
+    return result.copy() if isinstance(result, (dict, list)) else result
+
+
+def _cache_tool_results(tool: BaseTool, ttl: Optional[int] = None, maxsize: int = 256) -> None:
+    """
+    Wrap a tool's function with an LRU cache keyed by its JSON-encoded arguments
+    
+    With a TTL, entries are keyed by time bucket as well, so a result is reused
+    for at most `ttl` seconds. Dict and list results are shallow-copied on the
+    way out so callers cannot mutate the cached value. Tools without a sync
+    `func` are left unchanged.
+    """
+    func = getattr(tool, "func", None)
+    if func is None or getattr(func, "_skill_cached", False):
+        return
+    
+    @lru_cache(maxsize=maxsize)
+    def _call(key: str, _bucket: int) -> Any:
+        return func(**json.loads(key))
+    
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            key = json.dumps(kwargs, sort_keys=True)
+        except TypeError:
+            return func(*args, **kwargs)
+        if args:
+            return func(*args, **kwargs)
+        
+        bucket = int(time.monotonic() // ttl) if ttl else 0
+        if not logger.isEnabledFor(logging.DEBUG):
+            return _fresh(_call(key, bucket))
+        hits = _call.cache_info().hits
+        result = _call(key, bucket)
+        if _call.cache_info().hits > hits:
+            logger.debug(f"Tool cache hit: {tool.name}")
+        return _fresh(result)
+    
+    wrapper._skill_cached = True
+    wrapper.cache_clear = _call.cache_clear
+    tool.func = wrapper
 
 
 class SkillState:
     """Base state class for agent state management"""
-    pass
+    __slots__ = ()
 
 
 class SkillRegistry:
@@ -48,9 +101,21 @@ class SkillRegistry:
     """
     
     def __init__(self):
-        self._skills: Dict[str, SkillMetadata] = {}
-        self._tools: Dict[str, BaseTool] = {}
+        # skill name -> (metadata, tool)
+        self._entries: Dict[str, Tuple[SkillMetadata, BaseTool]] = {}
         self._modules: Dict[str, Any] = {}
+        # Lowercased name, lowercased description and tag bitmask per skill, for search()
+        self._search_index: Dict[str, Tuple[str, str, int]] = {}
+        # One bit per distinct tag, assigned in registration order
+        self._tag_bits: Dict[str, int] = {}
+        self._lazy_lock = threading.Lock()
+        # Bumped on every registration so callers can cache derived tool lists
+        self._version = 0
+    
+    @property
+    def version(self) -> int:
+        """Registration counter, changes whenever the set of skills changes"""
+        return self._version
     
     def register(
         self,
@@ -59,19 +124,48 @@ class SkillRegistry:
         metadata: Optional[SkillMetadata] = None
     ) -> None:
         """Register a skill"""
-        if metadata is None:
-            metadata = SkillMetadata(
-                name=name,
-                description=tool.description or ""
+        self.register_many([(name, tool, metadata)])
+    
+    def register_many(
+        self,
+        skills: List[Tuple[str, BaseTool, Optional[SkillMetadata]]]
+    ) -> None:
+        """
+        Register several skills at once
+        
+        Args:
+            skills: (name, tool, metadata) triples; metadata may be None
+        """
+        entries: Dict[str, Tuple[SkillMetadata, BaseTool]] = {}
+        search_index: Dict[str, Tuple[str, str, int]] = {}
+        for name, tool, metadata in skills:
+            if metadata is None:
+                metadata = SkillMetadata(
+                    name=name,
+                    description=tool.description or ""
+                )
+            if metadata.cacheable:
+                _cache_tool_results(tool, ttl=metadata.cache_ttl)
+            entries[name] = (metadata, tool)
+            search_index[name] = (
+                metadata.name.lower(),
+                metadata.description.lower(),
+                self._tag_mask(metadata.tags, assign=True)
             )
-        self._skills[name] = metadata
-        self._tools[name] = tool
-        logger.debug(f"Registered skill: {name}")
+        
+        if not entries:
+            return
+        self._entries.update(entries)
+        self._search_index.update(search_index)
+        self._version += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Registered skills: {', '.join(entries)}")
     
     def discover_and_load(
         self,
         skills_dir: Path,
-        module_name: str = "skill"
+        module_name: str = "skill",
+        lazy: bool = False
     ) -> int:
         """
         Discover and load skills from a directory
@@ -79,6 +173,9 @@ class SkillRegistry:
         Args:
             skills_dir: Directory containing skill modules
             module_name: Name pattern for skill modules (e.g., "skill" for skill_*.py)
+            lazy: Register placeholders from statically parsed source and import
+                each module on first tool use. Modules that cannot be described
+                without executing them are imported eagerly.
         
         Returns:
             Number of skills loaded
@@ -88,110 +185,245 @@ class SkillRegistry:
             return 0
         
         loaded_count = 0
+        batch: List[Tuple[str, BaseTool, SkillMetadata]] = []
+        
+        # Enumerate modules through the directory's cached path finder, which
+        # lists the directory once and reuses it for every find_spec call
+        finder = pkgutil.get_importer(str(skills_dir))
+        if finder is None:
+            logger.warning(f"No importer available for skills directory: {skills_dir}")
+            return 0
+        
+        # Look for Python files matching the pattern <module_name>_*.py
+        prefix = f"{module_name}_"
+        pending: List[Tuple[Path, ModuleSpec]] = []
+        for name, is_package in pkgutil.iter_importer_modules(finder):
+            if is_package or not name.startswith(prefix):
+                continue
+            spec = finder.find_spec(name)
+            if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+                continue
+            skill_file = Path(spec.origin)
+            
+            if lazy:
+                try:
+                    deferred_count = self._register_lazy(skill_file, module_name, batch)
+                except Exception as e:
+                    logger.error(f"Error loading skill from {skill_file}: {e}", exc_info=True)
+                    continue
+                if deferred_count:
+                    loaded_count += deferred_count
+                    continue
+            pending.append((skill_file, spec))
+        
+        # Module imports are largely I/O-bound, so execute them on a thread pool;
+        # registration below stays on this thread, in discovery order
+        if len(pending) >= _PARALLEL_LOAD_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+                futures = [
+                    pool.submit(self._load_module, skill_file, spec)
+                    for skill_file, spec in pending
+                ]
+        else:
+            futures = None
         
-        # Look for Python files matching the pattern
-        pattern = f"{module_name}_*.py"
-        for skill_file in skills_dir.glob(pattern):
+        for idx, (skill_file, spec) in enumerate(pending):
             try:
                 # Load the module
-                spec = importlib.util.spec_from_file_location(
-                    skill_file.stem,
-                    skill_file
-                )
-                if spec is None or spec.loader is None:
-                    continue
-                
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                
-                # Look for tools in the module
-                # Common patterns: tool, skill, get_tool, create_tool
-                tool = None
-                metadata = None
-                
-                # Try to find tools (support both single tool and multiple tools)
-                tools_to_register = []
-                
-                # Check for multiple tools first
-                if hasattr(module, "tools") and isinstance(module.tools, list):
-                    tools_to_register = module.tools
-                # Then check for single tool
-                elif hasattr(module, "tool"):
-                    tools_to_register = [module.tool]
-                elif hasattr(module, "skill"):
-                    tools_to_register = [module.skill]
-                elif hasattr(module, "get_tool"):
-                    tools_to_register = [module.get_tool()]
-                elif hasattr(module, "create_tool"):
-                    tools_to_register = [module.create_tool()]
-                
-                # Try to find metadata
-                if hasattr(module, "metadata"):
-                    metadata = module.metadata
-                elif hasattr(module, "METADATA"):
-                    metadata = module.METADATA
+                if futures is not None:
+                    module = futures[idx].result()
                 else:
-                    metadata = None
+                    module = self._load_module(skill_file, spec)
+                if module is None:
+                    continue
                 
-                if tools_to_register:
-                    base_skill_name = skill_file.stem.replace(f"{module_name}_", "")
-                    
-                    # Register each tool
-                    for idx, tool in enumerate(tools_to_register):
-                        if len(tools_to_register) == 1:
-                            # Single tool: use base name
-                            skill_name = base_skill_name
-                        else:
-                            # Multiple tools: append tool name or index
-                            tool_name = getattr(tool, "name", f"tool_{idx}")
-                            skill_name = f"{base_skill_name}_{tool_name}"
-                        
-                        # Create metadata for this tool
-                        if metadata is None:
-                            tool_metadata = SkillMetadata(
-                                name=skill_name,
-                                description=getattr(tool, "description", "") or ""
-                            )
-                        else:
-                            # Clone metadata and update name
-                            tool_metadata = SkillMetadata(
-                                name=skill_name,
-                                description=metadata.description or getattr(tool, "description", "") or "",
-                                tags=metadata.tags.copy() if metadata.tags else [],
-                                visibility=metadata.visibility,
-                                version=metadata.version,
-                                author=metadata.author,
-                                dependencies=metadata.dependencies.copy() if metadata.dependencies else []
-                            )
-                        
-                        self.register(skill_name, tool, tool_metadata)
-                        loaded_count += 1
-                        logger.info(f"Loaded skill: {skill_name} from {skill_file.name}")
-                    
-                    self._modules[base_skill_name] = module
-                else:
-                    logger.warning(f"No tool found in {skill_file.name}")
-                    
+                loaded_count += self._collect_module_tools(skill_file, module, module_name, batch)
             except Exception as e:
                 logger.error(f"Error loading skill from {skill_file}: {e}", exc_info=True)
         
+        self.register_many(batch)
         return loaded_count
     
+    def _collect_module_tools(
+        self,
+        skill_file: Path,
+        module: ModuleType,
+        module_name: str,
+        batch: List[Tuple[str, BaseTool, SkillMetadata]]
+    ) -> int:
+        """
+        Collect the tools exported by an imported skill module
+        
+        Returns:
+            Number of tools appended to batch
+        """
+        # Look for tools in the module
+        # Common patterns: tool, skill, get_tool, create_tool
+        # Probe the module namespace directly instead of hasattr()
+        namespace = vars(module)
+        
+        # Try to find tools (support both single tool and multiple tools)
+        tools_to_register = []
+        
+        # Check for multiple tools first
+        if isinstance(namespace.get("tools"), list):
+            tools_to_register = namespace["tools"]
+        # Then check for single tool
+        elif "tool" in namespace:
+            tools_to_register = [namespace["tool"]]
+        elif "skill" in namespace:
+            tools_to_register = [namespace["skill"]]
+        elif "get_tool" in namespace:
+            tools_to_register = [namespace["get_tool"]()]
+        elif "create_tool" in namespace:
+            tools_to_register = [namespace["create_tool"]()]
+        
+        # Try to find metadata
+        metadata = namespace.get("metadata", namespace.get("METADATA"))
+        
+        if not tools_to_register:
+            logger.warning(f"No tool found in {skill_file.name}")
+            return 0
+        
+        base_skill_name = skill_file.stem.replace(f"{module_name}_", "")
+        
+        # Collect each tool; registered together after the scan
+        for idx, tool in enumerate(tools_to_register):
+            if len(tools_to_register) == 1:
+                # Single tool: use base name
+                skill_name = base_skill_name
+            else:
+                # Multiple tools: append tool name or index
+                tool_name = getattr(tool, "name", f"tool_{idx}")
+                skill_name = f"{base_skill_name}_{tool_name}"
+            
+            tool_metadata = self._tool_metadata(metadata, skill_name, tool)
+            batch.append((skill_name, tool, tool_metadata))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Loaded skill: {skill_name} from {skill_file.name}")
+        
+        self._modules[base_skill_name] = module
+        return len(tools_to_register)
+    
+    @staticmethod
+    def _load_module(
+        skill_file: Path,
+        spec: Optional[ModuleSpec] = None
+    ) -> Optional[ModuleType]:
+        """Import a skill module from its file path (or an already found spec)"""
+        if spec is None:
+            spec = importlib.util.spec_from_file_location(
+                skill_file.stem,
+                skill_file
+            )
+        if spec is None or spec.loader is None:
+            return None
+        
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    
+    @staticmethod
+    def _tool_metadata(
+        metadata: Optional[SkillMetadata],
+        skill_name: str,
+        tool: BaseTool
+    ) -> SkillMetadata:
+        """Create the metadata for one tool of a skill module"""
+        if metadata is None:
+            return SkillMetadata(
+                name=skill_name,
+                description=getattr(tool, "description", "") or ""
+            )
+        # Clone metadata and update name; tags/dependencies lists are shared
+        # between the tools of one module, which treat metadata as read-only
+        return replace(
+            metadata,
+            name=skill_name,
+            description=metadata.description or getattr(tool, "description", "") or ""
+        )
+    
+    def _register_lazy(
+        self,
+        skill_file: Path,
+        module_name: str,
+        batch: List[Tuple[str, BaseTool, SkillMetadata]]
+    ) -> int:
+        """
+        Collect LazyTool placeholders for a skill module without importing it
+        
+        Args:
+            skill_file: Path to the skill module
+            module_name: Name pattern for skill modules
+            batch: List the (name, tool, metadata) triples are appended to
+        
+        Returns:
+            Number of skills registered, 0 if the module must be imported eagerly
+        """
+        scanned = scan_skill_file(skill_file)
+        if scanned is None:
+            return 0
+        
+        metadata_kwargs, specs = scanned
+        try:
+            metadata = SkillMetadata(**metadata_kwargs) if metadata_kwargs is not None else None
+        except TypeError:
+            return 0
+        
+        base_skill_name = skill_file.stem.replace(f"{module_name}_", "")
+        for spec in specs:
+            skill_name = base_skill_name if len(specs) == 1 else f"{base_skill_name}_{spec.name}"
+            tool = LazyTool(
+                spec,
+                loader=partial(self._resolve_lazy, skill_file, base_skill_name, skill_name, spec.name)
+            )
+            batch.append((skill_name, tool, self._tool_metadata(metadata, skill_name, tool)))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Deferred skill: {skill_name} from {skill_file.name}")
+        
+        return len(specs)
+    
+    def _resolve_lazy(
+        self,
+        skill_file: Path,
+        base_skill_name: str,
+        skill_name: str,
+        attr: str
+    ) -> BaseTool:
+        """Import a deferred skill module and swap the real tool into the registry"""
+        with self._lazy_lock:
+            module = self._modules.get(base_skill_name)
+            if module is None:
+                module = self._load_module(skill_file)
+                if module is None:
+                    raise ImportError(f"Cannot load skill module: {skill_file}")
+                self._modules[base_skill_name] = module
+            
+            tool = getattr(module, attr)
+            metadata = self._entries[skill_name][0]
+            if metadata.cacheable:
+                _cache_tool_results(tool, ttl=metadata.cache_ttl)
+            self._entries[skill_name] = (metadata, tool)
+        
+        logger.info(f"Loaded deferred skill: {skill_name} from {skill_file.name}")
+        return tool
+    
     def list_skills(
         self,
         filter_fn: Optional[Callable[[SkillMetadata], bool]] = None
     ) -> List[str]:
         """List all registered skill names"""
         if filter_fn is None:
-            return list(self._skills.keys())
+            return list(self._entries)
         return [
-            name for name, meta in self._skills.items()
+            name for name, (meta, _tool) in self._entries.items()
             if filter_fn(meta)
         ]
     
     def get_metadata(self, skill_name: str) -> Optional[SkillMetadata]:
         """Get metadata for a skill"""
-        return self._skills.get(skill_name)
+        entry = self._entries.get(skill_name)
+        return entry[0] if entry is not None else None
     
     def search(
         self,
@@ -208,56 +440,75 @@ class SkillRegistry:
         Returns:
             List of matching SkillMetadata
         """
+        if not query and not tags:
+            return [meta for meta, _tool in self._entries.values()]
+        
         results = []
         query_lower = query.lower()
+        tag_mask = self._tag_mask(tags) if tags else None
+        if tag_mask == 0:
+            # None of the requested tags is used by any skill
+            return results
         
-        for metadata in self._skills.values():
+        for name, (name_lower, description_lower, mask) in self._search_index.items():
             # Filter by query
-            if query:
-                matches_query = (
-                    query_lower in metadata.name.lower() or
-                    query_lower in metadata.description.lower()
-                )
-                if not matches_query:
-                    continue
+            if query and query_lower not in name_lower and query_lower not in description_lower:
+                continue
             
-            # Filter by tags
-            if tags:
-                matches_tags = any(tag in metadata.tags for tag in tags)
-                if not matches_tags:
-                    continue
+            # Filter by tags (any requested tag present)
+            if tag_mask is not None and not mask & tag_mask:
+                continue
             
-            results.append(metadata)
+            results.append(self._entries[name][0])
         
         return results
     
+    def _tag_mask(self, tags: List[str], assign: bool = False) -> int:
+        """
+        Combine tags into a bitmask
+        
+        Args:
+            tags: Tags to combine
+            assign: Allocate bits for unseen tags (otherwise they are ignored)
+        """
+        mask = 0
+        for tag in tags:
+            bit = self._tag_bits.get(tag)
+            if bit is None:
+                if not assign:
+                    continue
+                bit = self._tag_bits[tag] = 1 << len(self._tag_bits)
+            mask |= bit
+        return mask
+    
     def get_all_tools(
         self,
         filter_fn: Optional[Callable[[SkillMetadata], bool]] = None
     ) -> List[BaseTool]:
         """Get all tools, optionally filtered"""
         if filter_fn is None:
-            return list(self._tools.values())
+            return [tool for _meta, tool in self._entries.values()]
         
         return [
-            tool for name, tool in self._tools.items()
-            if name in self._skills and filter_fn(self._skills[name])
+            tool for meta, tool in self._entries.values()
+            if filter_fn(meta)
         ]
     
     def get_tool(self, skill_name: str) -> Optional[BaseTool]:
         """Get a tool by name"""
-        return self._tools.get(skill_name)
+        entry = self._entries.get(skill_name)
+        return entry[1] if entry is not None else None
     
     def __len__(self) -> int:
         """Return number of registered skills"""
-        return len(self._skills)
+        return len(self._entries)
     
     def __contains__(self, skill_name: str) -> bool:
         """Check if a skill is registered"""
-        return skill_name in self._skills
+        return skill_name in self._entries
     
     def __repr__(self) -> str:
-        return f"SkillRegistry({len(self._skills)} skills)"
+        return f"SkillRegistry({len(self._entries)} skills)"
 
 
 # Export main classes
@@ -0,0 +1,163 @@
+"""
+Lazy skill loading for Skill System
+Reads skill metadata and tool signatures from source without importing the module
+"""
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from pathlib import Path
+from dataclasses import dataclass
+import ast
+from langchain_core.tools import BaseTool
+from pydantic import PrivateAttr, create_model
+
+# Annotations that can be turned into an args schema without importing the module
+_SIMPLE_TYPES = {"str": str, "int": int, "float": float, "bool": bool}
+
+
+@dataclass
+class ToolSpec:
+    """Statically parsed signature of a @tool function"""
+    name: str
+    description: str
+    args: Dict[str, Tuple[type, Any]]
+
+
+def _tool_spec(node: ast.FunctionDef) -> Optional[ToolSpec]:
+    """Build a ToolSpec from a @tool function definition, or None if not resolvable"""
+    arguments = node.args
+    if arguments.vararg or arguments.kwarg or arguments.kwonlyargs or arguments.posonlyargs:
+        return None
+
+    defaults = [None] * (len(arguments.args) - len(arguments.defaults)) + list(arguments.defaults)
+    args: Dict[str, Tuple[type, Any]] = {}
+    for arg, default in zip(arguments.args, defaults):
+        annotation = arg.annotation
+        if not isinstance(annotation, ast.Name) or annotation.id not in _SIMPLE_TYPES:
+            return None
+        try:
+            value = ast.literal_eval(default) if default is not None else ...
+        except ValueError:
+            return None
+        args[arg.arg] = (_SIMPLE_TYPES[annotation.id], value)
+
+    return ToolSpec(
+        name=node.name,
+        description=ast.get_docstring(node) or "",
+        args=args
+    )
+
+
+def scan_skill_file(
+    skill_file: Path
+) -> Optional[Tuple[Optional[Dict[str, Any]], List[ToolSpec]]]:
+    """
+    Statically scan a skill module
+
+    Args:
+        skill_file: Path to the skill module
+
+    Returns:
+        (metadata kwargs or None, exported tool specs), or None if the module
+        cannot be described without executing it
+    """
+    tree = ast.parse(skill_file.read_text(encoding="utf-8"), filename=str(skill_file))
+
+    # Top-level name bindings in source order (later bindings win, as at runtime)
+    tool_functions: Dict[str, ast.FunctionDef] = {}
+    assignments: Dict[str, ast.AST] = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            if any(isinstance(d, ast.Name) and d.id == "tool" for d in node.decorator_list):
+                tool_functions[node.name] = node
+            assignments[node.name] = node
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                assignments[(alias.asname or alias.name).split(".")[0]] = node
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    assignments[target.id] = node.value
+        elif isinstance(node, (ast.If, ast.Try, ast.For, ast.While, ast.With)):
+            # Conditional bindings cannot be resolved statically
+            return None
+
+    # Metadata: SkillMetadata(...) called with literal keyword arguments only
+    metadata: Optional[Dict[str, Any]] = None
+    metadata_node = assignments.get("metadata", assignments.get("METADATA"))
+    if metadata_node is not None:
+        if not (
+            isinstance(metadata_node, ast.Call)
+            and isinstance(metadata_node.func, ast.Name)
+            and metadata_node.func.id == "SkillMetadata"
+            and not metadata_node.args
+        ):
+            return None
+        try:
+            metadata = {kw.arg: ast.literal_eval(kw.value) for kw in metadata_node.keywords}
+        except ValueError:
+            return None
+        if None in metadata:
+            return None
+
+    # Exported tools, in the same precedence as SkillRegistry.discover_and_load
+    exported = assignments.get("tools")
+    if isinstance(exported, ast.List):
+        names = exported.elts
+    elif isinstance(assignments.get("tool"), ast.Name):
+        names = [assignments["tool"]]
+    else:
+        return None
+
+    specs: List[ToolSpec] = []
+    for name in names:
+        if not isinstance(name, ast.Name) or name.id not in tool_functions:
+            return None
+        spec = _tool_spec(tool_functions[name.id])
+        if spec is None:
+            return None
+        specs.append(spec)
+
+    return metadata, specs
+
+
+class LazyTool(BaseTool):
+    """
+    Placeholder tool that imports its skill module on first use
+
+    Exposes the statically parsed name, description and args schema so it can be
+    bound to the agent before the module is imported.
+    """
+    _loader: Callable[[], BaseTool] = PrivateAttr()
+    _tool: Optional[BaseTool] = PrivateAttr(default=None)
+
+    def __init__(self, spec: ToolSpec, loader: Callable[[], BaseTool]):
+        """
+        Args:
+            spec: Statically parsed tool signature
+            loader: Callable that imports the module and returns the real tool
+        """
+        super().__init__(
+            name=spec.name,
+            description=spec.description,
+            args_schema=create_model(spec.name, **spec.args)
+        )
+        self._loader = loader
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the underlying module has been imported"""
+        return self._tool is not None
+
+    def resolve(self) -> BaseTool:
+        """Import the skill module (once) and return the real tool"""
+        if self._tool is None:
+            self._tool = self._loader()
+        return self._tool
+
+    def _run(self, **kwargs: Any) -> Any:
+        return self.resolve().invoke(kwargs)
+
+    async def _arun(self, **kwargs: Any) -> Any:
+        return await self.resolve().ainvoke(kwargs)
+
+
+__all__ = ["LazyTool", "ToolSpec", "scan_skill_file"]
@@ -1,7 +1,8 @@
 """
 State management classes for Skill System
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Deque
+from collections import deque
 from . import SkillState
 
 
@@ -9,9 +10,11 @@ class SkillStateAccumulative(SkillState):
     """
     Accumulative state - accumulates messages and state over time
     """
-    messages: List[Dict[str, Any]] = []
-    intermediate_steps: List[Any] = []
-    skill_history: List[Dict[str, Any]] = []
+    # Annotations only: values are per-instance, set in __init__
+    __slots__ = ("messages", "intermediate_steps", "skill_history")
+    messages: List[Dict[str, Any]]
+    intermediate_steps: List[Any]
+    skill_history: List[Dict[str, Any]]
     
     def __init__(self, **kwargs):
         """Initialize with optional state"""
@@ -39,26 +42,26 @@ class SkillStateFIFO(SkillState):
     """
     FIFO state - maintains a fixed-size queue of messages
     """
-    messages: List[Dict[str, Any]] = []
-    max_size: int = 100
+    # Annotations only: values are per-instance, set in __init__
+    __slots__ = ("messages", "max_size")
+    messages: Deque[Dict[str, Any]]
+    max_size: int
     
     def __init__(self, max_size: int = 100, **kwargs):
         """Initialize with max queue size"""
         self.max_size = max_size
-        self.messages = kwargs.get("messages", [])
+        # Bounded deque: oldest messages drop off the left as new ones arrive
+        self.messages = deque(kwargs.get("messages", []), maxlen=max_size)
         super().__init__()
     
     def append(self, new_messages: List[Dict[str, Any]]):
-        """Append new messages, maintaining FIFO order"""
+        """Append new messages, maintaining FIFO order (keeps the last max_size)"""
         self.messages.extend(new_messages)
-        # Keep only the last max_size messages
-        if len(self.messages) > self.max_size:
-            self.messages = self.messages[-self.max_size:]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         return {
-            "messages": self.messages,
+            "messages": list(self.messages),
             "max_size": self.max_size
         }
 
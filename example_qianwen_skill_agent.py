@@ -12,27 +12,25 @@ Usage:
     python example_qianwen_skill_agent.py
 """
 import os
+import asyncio
+try:
+    import sniffio  # Warm httpcore/anyio async-library detection before the first request
+except ImportError:
+    sniffio = None
 from pathlib import Path
 from dotenv import load_dotenv
-from langchain_community.chat_models import ChatTongyi
+from langchain_community.chat_models.tongyi import ChatTongyi
 
 from AgentSkill import create_skill_agent, SkillAgent
 from config import SkillSystemConfig
 
 # Load environment variables
-env_path = Path(__file__).parent / ".env"
-if env_path.exists():
-    load_dotenv(dotenv_path=env_path, override=True)
-else:
-    load_dotenv(dotenv_path=".env", override=True)
+load_dotenv(Path(__file__).with_name(".env"), override=True) or load_dotenv(".env", override=True)
 
 
 def get_env(key: str, default: str = None) -> str:
     """Get environment variable"""
-    value = os.environ.get(key)
-    if value is None:
-        return default
-    return value
+    return os.environ.get(key, default)
 
 
 def create_qianwen_model(
@@ -148,27 +146,30 @@ Always explain what you're doing and why."""
         "Can you use the example skill to process 'test message'?",
     ]
     
-    for i, user_input in enumerate(examples, 1):
+    # Run all examples concurrently (each is an independent request), print in order
+    results = asyncio.run(agent.abatch(
+        [{"messages": [{"role": "user", "content": user_input}]} for user_input in examples],
+        return_exceptions=True
+    ))
+    
+    for i, (user_input, result) in enumerate(zip(examples, results), 1):
         print(f"\nExample {i}:")
         print(f"User: {user_input}")
         print("Agent: ", end="", flush=True)
         
-        try:
-            result = agent.invoke({
-                "messages": [{"role": "user", "content": user_input}]
-            })
-            
-            # Extract response
-            if isinstance(result, dict) and "messages" in result:
-                response = result["messages"][-1].content
-            else:
-                response = str(result)
-            
-            print(response)
-        except Exception as e:
-            print(f"Error: {e}")
+        if isinstance(result, Exception):
+            print(f"Error: {result}")
             import traceback
-            traceback.print_exc()
+            traceback.print_exception(result)
+            continue
+        
+        # Extract response
+        if isinstance(result, dict) and "messages" in result:
+            response = result["messages"][-1].content
+        else:
+            response = str(result)
+        
+        print(response)
     
     print("\n" + "=" * 60)
     print("Example completed!")
@@ -1,35 +1,43 @@
 import os
+try:
+    import sniffio  # Warm httpcore/anyio async-library detection before the first request
+except ImportError:
+    sniffio = None
+import json
 from typing import Literal
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 from tavily import TavilyClient
-from deepagents import create_deep_agent
-from langchain_community.chat_models import ChatTongyi
+from deepagents.graph import create_deep_agent
+from langchain_community.chat_models.tongyi import ChatTongyi
 from deepagents.backends import CompositeBackend, StateBackend, StoreBackend
 from langgraph.store.memory import InMemoryStore
 from langgraph.checkpoint.memory import MemorySaver
-import uuid
 
 # Load environment variables from .env file if it exists
 # Use override=True to ensure .env file values take precedence over system environment variables
-env_path = Path(__file__).parent / ".env"
-if env_path.exists():
-    load_dotenv(dotenv_path=env_path, override=True)
-else:
-    # Also try loading from current directory as fallback
-    load_dotenv(dotenv_path=".env", override=True)
+# Fall back to .env in the current directory when there is none next to this file
+load_dotenv(Path(__file__).with_name(".env"), override=True) or load_dotenv(".env", override=True)
 
 def get_env(key: str, default: str = None) -> str:
     """Get environment variable from .env file (loaded into os.environ) or system env"""
-    value = os.environ.get(key)
-    if value is None:
-        return default
-    return value
+    return os.environ.get(key, default)
 
 tavily_client = TavilyClient(api_key=get_env("TAVILY_API_KEY"))
 
-# Simple cache for search results (query-based caching)
-_search_cache = {}
+# LRU cache for search results, keyed on the search arguments
+@lru_cache(maxsize=128, typed=False)
+def _cached_search(query, max_results, topic, include_raw_content):
+    """Tavily search cached on its arguments, as JSON text"""
+    result = tavily_client.search(
+        query,
+        max_results=max_results,
+        include_raw_content=include_raw_content,
+        topic=topic,
+    )
+    # Serialize once so cache hits skip json.dumps; an immutable str is safe to share between calls
+    return json.dumps(result, ensure_ascii=False)
 
 def internet_search(
     query: str,
@@ -38,33 +46,14 @@ def internet_search(
     include_raw_content: bool = False,
 ):
     """Run a web search with caching"""
-    # Create cache key
-    cache_key = f"{query}:{max_results}:{topic}:{include_raw_content}"
-    
-    # Check cache first
-    if cache_key in _search_cache:
-        return _search_cache[cache_key]
-    
-    # Perform API search
-    result = tavily_client.search(
-        query,
-        max_results=max_results,
-        include_raw_content=include_raw_content,
-        topic=topic,
-    )
-    
-    # Cache result (limit cache size to prevent memory issues)
-    if len(_search_cache) < 50:
-        _search_cache[cache_key] = result
-    
-    return result
+    return _cached_search(query, max_results, topic, include_raw_content)
 
 deepseek_model = ChatTongyi(
     model=get_env("DASHSCOPE_MODEL", "deepseek-v3"),  # Default to deepseek-v3
     api_key=get_env("DASHSCOPE_API_KEY"),
     temperature=0.7,
     top_p=0.8,
-    streaming=False,
+    streaming=True,  # Token streaming for chat_cli / chat_ui
 )
 
 checkpointer = MemorySaver()
@@ -97,6 +86,8 @@ agent = create_deep_agent(
 )
 
 if __name__ == "__main__":
+    import uuid
+
     # Thread 1: Write to long-term memory
     config1 = {"configurable": {"thread_id": str(uuid.uuid4())}}
 
@@ -2,7 +2,7 @@
 Middleware for Skill System
 Implements dynamic tool filtering based on context
 """
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Sequence, Tuple
 import logging
 from langchain.agents.middleware import AgentMiddleware
 from langchain_core.tools import BaseTool
@@ -21,18 +21,52 @@ class SkillMiddleware(AgentMiddleware):
         self,
         skill_registry: SkillRegistry,
         verbose: bool = False,
-        filter_fn: Optional[Callable[[SkillMetadata], bool]] = None
+        filter_fn: Optional[Callable[[SkillMetadata], bool]] = None,
+        precomputed_tools: Optional[Sequence[BaseTool]] = None,
+        precomputed_skill_names: Optional[Sequence[str]] = None
     ):
         """
         Args:
             skill_registry: The skill registry to use
             verbose: Whether to log filtering decisions
             filter_fn: Optional function to filter skills by metadata
+            precomputed_tools: Tools already filtered with filter_fn, reused
+                until the registry changes
+            precomputed_skill_names: Skill names already filtered with filter_fn
         """
         super().__init__()
         self.registry = skill_registry
         self.verbose = verbose
         self.filter_fn = filter_fn
+        # (registry version, id(filter_fn), value): valid while both keys still match
+        version = skill_registry.version
+        self._tools_cache: Tuple[Optional[int], Optional[int], Optional[List[BaseTool]]] = (
+            (version, id(filter_fn), list(precomputed_tools))
+            if precomputed_tools is not None else (None, None, None)
+        )
+        self._names_cache: Tuple[Optional[int], Optional[int], Optional[Tuple[str, ...]]] = (
+            (version, id(filter_fn), tuple(precomputed_skill_names))
+            if precomputed_skill_names is not None else (None, None, None)
+        )
+    
+    def _filtered_tools(self) -> List[BaseTool]:
+        """Tools passing filter_fn, recomputed only when the registry or filter changed"""
+        key = (self.registry.version, id(self.filter_fn))
+        if self._tools_cache[:2] != key:
+            if self.filter_fn:
+                tools = self.registry.get_all_tools(filter_fn=self.filter_fn)
+            else:
+                tools = self.registry.get_all_tools()
+            self._tools_cache = (*key, tools)
+        return list(self._tools_cache[2])
+    
+    @property
+    def skill_names(self) -> Tuple[str, ...]:
+        """Names of skills passing filter_fn"""
+        key = (self.registry.version, id(self.filter_fn))
+        if self._names_cache[:2] != key:
+            self._names_cache = (*key, tuple(self.registry.list_skills(filter_fn=self.filter_fn)))
+        return self._names_cache[2]
     
     def __call__(
         self,
@@ -55,10 +89,7 @@ class SkillMiddleware(AgentMiddleware):
         current_tools = agent_input.get("tools", [])
         
         # Filter tools based on registry and filter function
-        if self.filter_fn:
-            filtered_tools = self.registry.get_all_tools(filter_fn=self.filter_fn)
-        else:
-            filtered_tools = self.registry.get_all_tools()
+        filtered_tools = self._filtered_tools()
         
         if self.verbose:
             logger.info(
@@ -86,9 +117,7 @@ class SkillMiddleware(AgentMiddleware):
             Filtered list of tools
         """
         # Use registry's filter function if available
-        if self.filter_fn:
-            return self.registry.get_all_tools(filter_fn=self.filter_fn)
-        return self.registry.get_all_tools()
+        return self._filtered_tools()
 
 
 __all__ = ["SkillMiddleware"]
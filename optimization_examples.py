@@ -6,8 +6,8 @@
 import os
 import time
 from typing import Literal
-from functools import lru_cache
-from collections import deque  # 使用 deque 代替 list 用于高效追加
+from collections import OrderedDict, deque  # 使用 deque 代替 list 用于高效追加
+from operator import methodcaller
 
 # ============================================================================
 # 代码级优化示例
@@ -16,36 +16,44 @@ from collections import deque  # 使用 deque 代替 list 用于高效追加
 # 1. 使用 __slots__ 减少内存开销
 class OptimizedSearchCache:
     """优化的搜索缓存类 - 使用 __slots__"""
-    __slots__ = ('_cache', '_max_size', '_access_order')
+    __slots__ = ('_cache', '_max_size')
     
     def __init__(self, max_size=50):
-        self._cache = {}
+        # OrderedDict 同时保存数据和访问顺序，命中/淘汰均为 O(1)
+        # 不做预分配：CPython 的 clear() 会释放哈希表，而淘汰+插入的循环
+        # 迟早触发一次按存活项数重建的 resize，预先扩容省不下稳态开销
+        self._cache = OrderedDict()
         self._max_size = max_size
-        self._access_order = deque(maxlen=max_size)  # 使用 deque 代替 list
     
     def get(self, key):
-        if key in self._cache:
-            # 更新访问顺序（deque 自动处理大小限制）
-            if key in self._access_order:
-                self._access_order.remove(key)
-            self._access_order.append(key)
-            return self._cache[key]
-        return None
+        try:
+            # 命中时移到末尾（最近使用）
+            self._cache.move_to_end(key)
+        except KeyError:
+            return None
+        return self._cache[key]
     
     def set(self, key, value):
-        if len(self._cache) >= self._max_size:
-            # 移除最旧的项
-            oldest = self._access_order.popleft()
-            del self._cache[oldest]
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        elif len(self._cache) >= self._max_size:
+            # 移除最久未使用的项
+            self._cache.popitem(last=False)
         self._cache[key] = value
-        self._access_order.append(key)
 
 
 # 2. 重用对象而不是创建新对象
 class ObjectPool:
     """对象池 - 重用对象减少创建开销"""
-    def __init__(self, factory, max_size=10):
+    def __init__(self, factory, reset=None, max_size=10):
+        """
+        Args:
+            factory: 创建新对象的函数
+            reset: 对象放回池前调用的重置函数（默认不做任何事）
+            max_size: 池的最大容量
+        """
         self._factory = factory
+        self._reset = reset or (lambda _obj: None)
         self._pool = deque(maxlen=max_size)
         self._max_size = max_size
     
@@ -58,60 +66,64 @@ class ObjectPool:
     def release(self, obj):
         """释放对象回池中"""
         if len(self._pool) < self._max_size:
-            # 重置对象状态
-            if hasattr(obj, 'reset'):
-                obj.reset()
+            # 重置对象状态（由构造时约定，无需每次 hasattr 检查）
+            self._reset(obj)
             self._pool.append(obj)
 
 
 # 3. 最小化字典/列表复制操作
 def optimized_message_processing(messages):
-    """优化的消息处理 - 避免不必要的复制"""
+    """优化的消息处理 - 生成器，逐条产出处理结果而不复制整个列表"""
     # ❌ 不好的做法：创建新列表
     # processed = list(messages)
     # processed.append(new_msg)
     
-    # ✅ 好的做法：如果可能，直接修改
-    # 或者使用生成器
-    def process_messages():
-        for msg in messages:
-            # 处理消息但不复制
-            yield process_single_message(msg)
-    
-    return list(process_messages())  # 只在需要时转换为列表
+    # ✅ 好的做法：惰性产出，调用方按需消费（可提前停止）
+    # 需要列表时由调用方显式 list(optimized_message_processing(...))
+    for msg in normalize_messages(messages):
+        # 处理消息但不复制
+        yield process_single_message(msg)
+
+
+def normalize_messages(messages):
+    """在批次入口统一消息格式（惰性）：非字典消息包装为 {'content': str(msg)}"""
+    # 类型判断只在入口做一次，之后的热循环可以假定每条消息都是字典
+    return (msg if isinstance(msg, dict) else {'content': str(msg)} for msg in messages)
+
+
+# 预先绑定的键读取（C 实现，避免每次调用查找 .get 方法）
+_role_get = methodcaller('get', 'role')
+_content_get = methodcaller('get', 'content', '')
+_MAX_CONTENT_LENGTH = 1000
 
 
 def process_single_message(msg):
-    """处理单个消息"""
-    # 避免创建中间字典
-    if isinstance(msg, dict):
-        # 直接访问，不复制
-        return {
-            'role': msg.get('role'),
-            'content': msg.get('content', '')[:1000]  # 限制长度
-        }
-    return msg
+    """处理单个消息（msg 须已经过 normalize_messages，即字典）"""
+    # 直接访问，不复制
+    content = _content_get(msg)
+    return {
+        'role': _role_get(msg),
+        # 限制长度；已足够短时不切片，避免新建字符串
+        'content': content if len(content) <= _MAX_CONTENT_LENGTH else content[:_MAX_CONTENT_LENGTH]
+    }
 
 
 # 4. 使用生成器代替列表
 def optimized_token_estimation(messages):
-    """优化的 token 估算 - 使用生成器"""
+    """优化的 token 估算 - 使用生成器（messages 须已经过 normalize_messages）"""
     # ❌ 不好的做法：创建完整字符串
     # text = " ".join(str(msg.get("content", "")) for msg in messages)
     # tokens = len(text) // 4
     
     # ✅ 好的做法：直接计算长度
-    total_length = sum(
-        len(str(msg.get("content", ""))) if isinstance(msg, dict) else len(str(msg))
-        for msg in messages
-    )
-    return total_length // 4
+    # 入口已统一为字典：取内容、求长度、求和都通过 map 在 C 层完成，循环内无类型判断
+    return sum(map(len, map(_content_get, messages))) // 4
 
 
-# 5. 缓存计算结果
-@lru_cache(maxsize=100)
+# 5. 不要缓存比缓存本身更便宜的计算
+# lru_cache 的参数哈希 + 查表开销高于一次 f-string 拼接，且搜索键多为一次性的
 def cached_search_key(query: str, max_results: int, topic: str) -> str:
-    """缓存的搜索键生成"""
+    """搜索键生成（在调用处按需计算一次，不做缓存）"""
     return f"{query}:{max_results}:{topic}"
 
 
@@ -133,10 +145,12 @@ else:
 """
 
 # 2. 连接池示例（用于 API 客户端）
+import atexit
+
 try:
     import httpx
     
-    # 创建连接池
+    # 创建连接池（进程内共享，keep-alive 复用 TCP/TLS 连接）
     _http_client = None
     
     def get_http_client():
@@ -145,7 +159,7 @@ try:
         if _http_client is None:
             _http_client = httpx.Client(
                 timeout=30.0,
-                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
             )
         return _http_client
     
@@ -160,6 +174,12 @@ except ImportError:
     # httpx 不可用时使用默认实现
     def get_http_client():
         return None
+    
+    def close_http_client():
+        pass
+
+# 进程退出时关闭连接池
+atexit.register(close_http_client)
 
 
 # 3. 异步操作示例
@@ -169,10 +189,12 @@ try:
     
     async def async_search_queries(queries):
         """异步执行多个搜索查询"""
-        async with aiohttp.ClientSession() as session:
+        # 整批查询共用一个会话（连接池 + DNS 缓存），由 async with 在批次结束时关闭：
+        # aiohttp 会话绑定创建它的事件循环，不宜做成跨循环的模块级全局对象
+        connector = aiohttp.TCPConnector(limit=200, ttl_dns_cache=300, keepalive_timeout=30)
+        async with aiohttp.ClientSession(connector=connector) as session:
             tasks = [async_single_search(session, query) for query in queries]
-            results = await asyncio.gather(*tasks)
-            return results
+            return await asyncio.gather(*tasks)
     
     async def async_single_search(session, query):
         """单个异步搜索"""
@@ -193,14 +215,14 @@ def limit_message_history(messages, max_messages=10):
     if len(messages) <= max_messages:
         return messages
     
-    # 保留系统消息和最近的 N 条消息
-    system_messages = [msg for msg in messages if msg.get('role') == 'system']
-    other_messages = [msg for msg in messages if msg.get('role') != 'system']
-    
-    # 只保留最近的 N 条非系统消息
-    recent_messages = other_messages[-max_messages:]
+    # 保留系统消息和最近的 N 条消息（单次遍历）
+    system_messages = []
+    # 只保留最近的 N 条非系统消息：deque 满后自动丢弃最旧的
+    recent_messages = deque(maxlen=max_messages)
+    for msg in messages:
+        (system_messages if msg.get('role') == 'system' else recent_messages).append(msg)
     
-    return system_messages + recent_messages
+    return system_messages + list(recent_messages)
 
 
 # 2. 优化的系统提示（更短更直接）
@@ -283,7 +305,8 @@ if __name__ == "__main__":
     limited = limit_message_history(messages, max_messages=5)
     print(f"Limited messages: {len(limited)}")
     
-    # 示例：优化的 token 估算
-    token_count = optimized_token_estimation(messages)
+    # 示例：优化的 token 估算（直接消费生成器，不生成中间列表）
+    # 估算原始消息，而非 optimized_message_processing 截断后的内容
+    token_count = optimized_token_estimation(normalize_messages(messages))
     print(f"Estimated tokens: {token_count}")
 
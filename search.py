@@ -1,47 +1,51 @@
 import os
+import sys
 import time
 from typing import Literal, Dict, List
 from pathlib import Path
 from collections import defaultdict
+from array import array
+from itertools import islice
+from operator import sub
+from functools import lru_cache
 from dotenv import load_dotenv
 from tavily import TavilyClient
-from deepagents import create_deep_agent
-from langchain_community.chat_models import ChatTongyi
+from deepagents.graph import create_deep_agent
+from langchain_community.chat_models.tongyi import ChatTongyi
 
 # Load environment variables from .env file if it exists
 # Use override=True to ensure .env file values take precedence over system environment variables
-env_path = Path(__file__).parent / ".env"
-if env_path.exists():
-    load_dotenv(dotenv_path=env_path, override=True)
-else:
-    # Also try loading from current directory as fallback
-    load_dotenv(dotenv_path=".env", override=True)
+# Fall back to .env in the current directory when there is none next to this file
+load_dotenv(Path(__file__).with_name(".env"), override=True) or load_dotenv(".env", override=True)
 
-def get_env(key: str, default: str = None) -> str:
-    """Get environment variable from .env file (loaded into os.environ) or system env"""
-    value = os.environ.get(key)
-    if value is None:
-        return default
-    return value
+# Read every setting this script needs from .env / system env in one pass
+_env = os.environ
+_config = {
+    key: _env.get(key, default)
+    for key, default in (
+        ("DASHSCOPE_MODEL", "deepseek-v3"),
+        ("DASHSCOPE_API_KEY", None),
+        ("TAVILY_API_KEY", None),
+        ("SEARCH_VERBOSE", ""),
+    )
+}
 
-tavily_client = TavilyClient(api_key=get_env("TAVILY_API_KEY"))
+# Per-call trace lines, off by default: set SEARCH_VERBOSE=1 (or true/yes/on) to print them
+VERBOSE = _config["SEARCH_VERBOSE"].strip().lower() in {"1", "true", "yes", "on"}
 
-# Simple cache for search results (query-based caching)
-_search_cache = {}
+tavily_client = TavilyClient(api_key=_config["TAVILY_API_KEY"])
 
 # Performance tracking for Tavily searches
-_tavily_timings = {
-    "total_searches": 0,
-    "total_time": 0.0,
-    "cached_searches": 0,
-    "api_calls": 0,
-    "api_time": 0.0,
-    "cache_time": 0.0,
-}
+# Search/hit/API-call counts come from _cached_search.cache_info()
+# Integer-indexed counters: cheaper to update per call than string-keyed dict entries
+_TAVILY_TOTAL_TIME, _TAVILY_API_TIME, _TAVILY_CACHE_TIME = range(3)
+_tavily_timings = array("d", [0.0] * 3)
 
 def get_tavily_stats():
     """Get Tavily search performance statistics"""
-    if _tavily_timings["total_searches"] == 0:
+    info = _cached_search.cache_info()
+    total_searches = info.hits + info.misses
+    if total_searches == 0:
         return {
             "total_searches": 0,
             "cached_searches": 0,
@@ -52,16 +56,27 @@ def get_tavily_stats():
         }
     
     return {
-        "total_searches": _tavily_timings["total_searches"],
-        "cached_searches": _tavily_timings["cached_searches"],
-        "api_calls": _tavily_timings["api_calls"],
-        "avg_api_time": _tavily_timings["api_time"] / _tavily_timings["api_calls"] if _tavily_timings["api_calls"] > 0 else 0.0,
-        "avg_cache_time": _tavily_timings["cache_time"] / _tavily_timings["cached_searches"] if _tavily_timings["cached_searches"] > 0 else 0.0,
-        "total_time": _tavily_timings["total_time"],
-        "api_time": _tavily_timings["api_time"],
-        "cache_time": _tavily_timings["cache_time"],
+        "total_searches": total_searches,
+        "cached_searches": info.hits,
+        "api_calls": info.misses,
+        "avg_api_time": _tavily_timings[_TAVILY_API_TIME] / info.misses if info.misses > 0 else 0.0,
+        "avg_cache_time": _tavily_timings[_TAVILY_CACHE_TIME] / info.hits if info.hits > 0 else 0.0,
+        "total_time": _tavily_timings[_TAVILY_TOTAL_TIME],
+        "api_time": _tavily_timings[_TAVILY_API_TIME],
+        "cache_time": _tavily_timings[_TAVILY_CACHE_TIME],
     }
 
+# LRU cache for search results, keyed on the search arguments
+@lru_cache(maxsize=128, typed=False)
+def _cached_search(query, max_results, topic, include_raw_content):
+    """Perform the Tavily API search (only runs on cache misses)"""
+    return tavily_client.search(
+        query,
+        max_results=max_results,
+        include_raw_content=include_raw_content,  # False = faster, only summaries
+        topic=topic,
+    )
+
 def internet_search(
     query: str,
     max_results: int = 3,  # Reduced from 5 to 3 for faster results
@@ -69,40 +84,22 @@ def internet_search(
     include_raw_content: bool = False,  # Keep False to avoid fetching full content
 ):
     """Run a web search - optimized for speed with caching"""
-    search_start = time.time()
-    _tavily_timings["total_searches"] += 1
-    
-    # Create cache key
-    cache_key = f"{query}:{max_results}:{topic}:{include_raw_content}"
-    
-    # Check cache first
-    if cache_key in _search_cache:
-        cache_time = time.time() - search_start
-        _tavily_timings["cached_searches"] += 1
-        _tavily_timings["cache_time"] += cache_time
-        _tavily_timings["total_time"] += cache_time
-        print(f"[Tavily Cache Hit] Query: '{query}' | Time: {cache_time:.3f}s")
-        return _search_cache[cache_key]
-    
-    # Perform API search
-    api_start = time.time()
-    result = tavily_client.search(
-        query,
-        max_results=max_results,
-        include_raw_content=include_raw_content,  # False = faster, only summaries
-        topic=topic,
-    )
-    api_time = time.time() - api_start
+    search_start = time.perf_counter()
+    hits = _cached_search.cache_info().hits
     
-    _tavily_timings["api_calls"] += 1
-    _tavily_timings["api_time"] += api_time
-    _tavily_timings["total_time"] += (time.time() - search_start)
+    result = _cached_search(query, max_results, topic, include_raw_content)
     
-    print(f"[Tavily API Call] Query: '{query}' | Time: {api_time:.3f}s | Results: {max_results}")
-    
-    # Cache result (limit cache size to prevent memory issues)
-    if len(_search_cache) < 50:  # Keep cache size reasonable
-        _search_cache[cache_key] = result
+    # One elapsed time serves the total and the cache-hit or API bucket
+    search_time = time.perf_counter() - search_start
+    _tavily_timings[_TAVILY_TOTAL_TIME] += search_time
+    if _cached_search.cache_info().hits > hits:
+        _tavily_timings[_TAVILY_CACHE_TIME] += search_time
+        if VERBOSE:
+            print(f"[Tavily Cache Hit] Query: '{query}' | Time: {search_time:.3f}s")
+    else:
+        _tavily_timings[_TAVILY_API_TIME] += search_time
+        if VERBOSE:
+            print(f"[Tavily API Call] Query: '{query}' | Time: {search_time:.3f}s | Results: {max_results}")
     
     return result
 
@@ -119,16 +116,12 @@ You have access to an internet search tool. Use it strategically:
 """
 
 # Performance tracking for DeepSeek API calls
-_deepseek_timings = {
-    "total_calls": 0,
-    "total_time": 0.0,
-    "total_tokens_input": 0,
-    "total_tokens_output": 0,
-}
+_DEEPSEEK_CALLS, _DEEPSEEK_TIME, _DEEPSEEK_TOKENS_IN, _DEEPSEEK_TOKENS_OUT = range(4)
+_deepseek_timings = array("d", [0.0] * 4)
 
 def get_deepseek_stats():
     """Get DeepSeek API performance statistics"""
-    if _deepseek_timings["total_calls"] == 0:
+    if _deepseek_timings[_DEEPSEEK_CALLS] == 0:
         return {
             "total_calls": 0,
             "total_time": 0.0,
@@ -138,11 +131,11 @@ def get_deepseek_stats():
         }
     
     return {
-        "total_calls": _deepseek_timings["total_calls"],
-        "total_time": _deepseek_timings["total_time"],
-        "avg_time": _deepseek_timings["total_time"] / _deepseek_timings["total_calls"],
-        "total_tokens_input": _deepseek_timings["total_tokens_input"],
-        "total_tokens_output": _deepseek_timings["total_tokens_output"],
+        "total_calls": int(_deepseek_timings[_DEEPSEEK_CALLS]),
+        "total_time": _deepseek_timings[_DEEPSEEK_TIME],
+        "avg_time": _deepseek_timings[_DEEPSEEK_TIME] / _deepseek_timings[_DEEPSEEK_CALLS],
+        "total_tokens_input": int(_deepseek_timings[_DEEPSEEK_TOKENS_IN]),
+        "total_tokens_output": int(_deepseek_timings[_DEEPSEEK_TOKENS_OUT]),
     }
 
 # Configure DashScope DeepSeek model
@@ -153,62 +146,75 @@ def get_deepseek_stats():
 # Add DASHSCOPE_API_KEY and optionally DASHSCOPE_MODEL to .env file
 # Optimized: Using faster model parameters
 _base_deepseek_model = ChatTongyi(
-    model=get_env("DASHSCOPE_MODEL", "deepseek-v3"),  # Default to deepseek-v3
-    api_key=get_env("DASHSCOPE_API_KEY"),
+    model=_config["DASHSCOPE_MODEL"],  # Default to deepseek-v3
+    api_key=_config["DASHSCOPE_API_KEY"],
     temperature=0.7,  # Lower temperature for faster, more deterministic responses
     top_p=0.8,  # Optimized for speed
     streaming=False,  # Set to True if you want streaming (can feel faster)
 )
 
+def _list_input_length(input):
+    """Text length of a list of message dicts / message objects"""
+    contents = (msg.get("content", "") if isinstance(msg, dict) else msg for msg in input)
+    return sum(map(len, map(str, contents)))
+
+def _prompt_input_length(input):
+    """Text length of a prompt value with a .messages list"""
+    return sum(
+        len(msg.content) if hasattr(msg, 'content') else len(str(msg))
+        for msg in input.messages
+    )
+
+def _text_input_length(input):
+    """Text length of any other input"""
+    return len(str(input))
+
+def _input_length_fn(input):
+    """Pick the length estimator for this input's shape"""
+    if isinstance(input, list):
+        return _list_input_length
+    if hasattr(input, 'messages'):
+        return _prompt_input_length
+    return _text_input_length
+
 # Create a wrapper class to track DeepSeek API calls
 # Optimized: Using __slots__ to reduce memory overhead
 class TimedChatTongyi:
     """Wrapper around ChatTongyi to track API call times - optimized for performance"""
-    __slots__ = ('_model', '_attr_cache')  # Reduce memory overhead
+    __slots__ = ('_model', '_attr_cache', '_len_type', '_len_fn')  # Reduce memory overhead
     
     def __init__(self, base_model):
         self._model = base_model
-        # Cache commonly accessed attributes to avoid repeated lookups
-        self._attr_cache = {}
-        # Only copy essential attributes, not all attributes (reduces object creation)
-        essential_attrs = ['model', 'temperature', 'top_p', 'streaming', 'api_key']
-        for attr in essential_attrs:
-            if hasattr(base_model, attr):
-                try:
-                    self._attr_cache[attr] = getattr(base_model, attr)
-                except:
-                    pass
+        # Snapshot the commonly read attributes once; the set is fixed, so the cache stays bounded
+        essential_attrs = ('model', 'temperature', 'top_p', 'streaming', 'api_key')
+        self._attr_cache = {
+            attr: getattr(base_model, attr) for attr in essential_attrs if hasattr(base_model, attr)
+        }
+        # Input length estimator, specialized on the first invoke() input type
+        self._len_type = None
+        self._len_fn = None
     
     def invoke(self, input, config=None, **kwargs):
         """Track time for each API call - optimized string operations"""
-        call_start = time.time()
-        _deepseek_timings["total_calls"] += 1
+        call_start = time.perf_counter()
+        _deepseek_timings[_DEEPSEEK_CALLS] += 1
         
         # Optimized token estimation - avoid creating intermediate strings
-        input_text_len = 0
-        if isinstance(input, list):
-            # More efficient: sum lengths instead of joining
-            input_text_len = sum(
-                len(str(msg.get("content", ""))) if isinstance(msg, dict) else len(str(msg))
-                for msg in input
-            )
-        elif hasattr(input, 'messages'):
-            input_text_len = sum(
-                len(msg.content) if hasattr(msg, 'content') else len(str(msg))
-                for msg in input.messages
-            )
-        else:
-            input_text_len = len(str(input))
+        # Input shape is stable across calls: dispatch on type once, re-check only on change
+        input_type = type(input)
+        if input_type is not self._len_type:
+            self._len_type = input_type
+            self._len_fn = _input_length_fn(input)
         
-        estimated_input_tokens = input_text_len // 4
-        _deepseek_timings["total_tokens_input"] += estimated_input_tokens
+        estimated_input_tokens = self._len_fn(input) // 4
+        _deepseek_timings[_DEEPSEEK_TOKENS_IN] += estimated_input_tokens
         
         # Make the actual API call
         result = self._model.invoke(input, config=config, **kwargs)
         
         # Calculate time and tokens
-        call_time = time.time() - call_start
-        _deepseek_timings["total_time"] += call_time
+        call_time = time.perf_counter() - call_start
+        _deepseek_timings[_DEEPSEEK_TIME] += call_time
         
         # Optimized output token estimation
         if hasattr(result, 'content'):
@@ -216,52 +222,47 @@ class TimedChatTongyi:
         else:
             output_text_len = len(str(result))
         estimated_output_tokens = output_text_len // 4
-        _deepseek_timings["total_tokens_output"] += estimated_output_tokens
+        _deepseek_timings[_DEEPSEEK_TOKENS_OUT] += estimated_output_tokens
         
-        # Print call info (only if needed - can be disabled for production)
-        print(f"[DeepSeek API Call #{_deepseek_timings['total_calls']}] Time: {call_time:.3f}s | "
-              f"Input: ~{estimated_input_tokens} tokens | Output: ~{estimated_output_tokens} tokens")
+        # Print call info (only with SEARCH_VERBOSE=1)
+        if VERBOSE:
+            print(f"[DeepSeek API Call #{int(_deepseek_timings[_DEEPSEEK_CALLS])}] Time: {call_time:.3f}s | "
+                  f"Input: ~{estimated_input_tokens} tokens | Output: ~{estimated_output_tokens} tokens")
         
         return result
     
     def __getattr__(self, name):
-        """Delegate other attribute access to base model - with caching"""
-        # Check cache first
-        if name in self._attr_cache:
+        """Delegate other attribute access to base model"""
+        try:
             return self._attr_cache[name]
-        # Fallback to base model
-        attr = getattr(self._model, name)
-        # Cache for future access
-        if not name.startswith('_'):
-            self._attr_cache[name] = attr
-        return attr
+        except KeyError:
+            # Everything else (bind_tools, etc.) resolves on the base model, without caching
+            return getattr(self._model, name)
 
 # Wrap the model with timing tracker
 deepseek_model = TimedChatTongyi(_base_deepseek_model)
 
 # Track timing between operations to analyze agent overhead
-_operation_timestamps = []
+# Names and times in parallel sequences: times stay packed as C doubles
+_op_names: List[str] = []
+_op_times = array("d")
 
 def record_operation(operation_name: str):
     """Record a timestamp for an operation"""
-    _operation_timestamps.append((operation_name, time.time()))
+    _op_names.append(sys.intern(operation_name))
+    _op_times.append(time.perf_counter())
 
 def analyze_operation_gaps():
-    """Analyze time gaps between operations to identify overhead"""
-    if len(_operation_timestamps) < 2:
+    """Analyze time gaps between operations, keyed by (previous, current) operation"""
+    if len(_op_times) < 2:
         return {}
     
-    gaps = {}
-    for i in range(1, len(_operation_timestamps)):
-        prev_op, prev_time = _operation_timestamps[i-1]
-        curr_op, curr_time = _operation_timestamps[i]
-        gap = curr_time - prev_time
-        gap_key = f"{prev_op} -> {curr_op}"
-        if gap_key not in gaps:
-            gaps[gap_key] = []
-        gaps[gap_key].append(gap)
+    gaps = defaultdict(list)
+    transitions = zip(_op_names, islice(_op_names, 1, None))
+    for key, gap in zip(transitions, map(sub, islice(_op_times, 1, None), _op_times)):
+        gaps[key].append(gap)
     
-    return gaps
+    return dict(gaps)
 
 # Create agent with performance callback
 agent = create_deep_agent(
@@ -281,14 +282,14 @@ if __name__ == "__main__":
         "llm_calls": 0.0,
     }
     
-    total_start = time.time()
+    total_start = time.perf_counter()
     
     # Track agent execution with detailed timing
-    agent_start = time.time()
+    agent_start = time.perf_counter()
     result = agent.invoke({"messages": [{"role": "user", "content": "What is langgraph?"}]})
-    agent_end = time.time()
+    agent_end = time.perf_counter()
     
-    elapsed_time = time.time() - total_start
+    elapsed_time = agent_end - total_start
     timing_breakdown["agent_execution"] = agent_end - agent_start
 
     # Print the agent's response
@@ -3,33 +3,40 @@ Streamlit UI for Skill Agent with Qianwen Model
 Run with: streamlit run skill_agent_ui.py
 """
 import streamlit as st
+import html
+import json
+import re
 import sys
+from collections import deque
 from pathlib import Path
 import os
-from dotenv import load_dotenv
-from langchain_community.chat_models import ChatTongyi
+from typing import TYPE_CHECKING, Optional
 
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from AgentSkill import create_skill_agent, SkillAgent
-from config import SkillSystemConfig
-from core import SkillMetadata
+from utils import iter_async, render_stream, reply_chunk_text, run_async
+
+# Heavy modules (LangChain, the skill system) are imported inside the functions
+# that use them, so a plain widget rerun does not touch them at top level
+if TYPE_CHECKING:
+    from langchain_community.chat_models.tongyi import ChatTongyi
+    from AgentSkill import SkillAgent
+
+
+@st.cache_resource(show_spinner=False)
+def _load_env() -> bool:
+    """Load environment variables once per server process, not on every rerun"""
+    from dotenv import load_dotenv
+    return load_dotenv(Path(__file__).with_name(".env"), override=True) or load_dotenv(".env", override=True)
 
-# Load environment variables
-env_path = Path(__file__).parent / ".env"
-if env_path.exists():
-    load_dotenv(dotenv_path=env_path, override=True)
-else:
-    load_dotenv(dotenv_path=".env", override=True)
+
+_load_env()
 
 
 def get_env(key: str, default: str = None) -> str:
     """Get environment variable"""
-    value = os.environ.get(key)
-    if value is None:
-        return default
-    return value
+    return os.environ.get(key, default)
 
 
 def create_qianwen_model(
@@ -37,8 +44,10 @@ def create_qianwen_model(
     temperature: float = 0.7,
     top_p: float = 0.8,
     streaming: bool = False
-) -> ChatTongyi:
+) -> "ChatTongyi":
     """Create a Qianwen chat model instance"""
+    from langchain_community.chat_models.tongyi import ChatTongyi
+    
     api_key = get_env("DASHSCOPE_API_KEY")
     if not api_key:
         raise ValueError("DASHSCOPE_API_KEY not found")
@@ -52,6 +61,182 @@ def create_qianwen_model(
     )
 
 
+def stream_response(prompt):
+    """Yield the agent's reply token by token as the model generates it"""
+    # Drive the async stream on the shared loop so concurrent sessions overlap their model waits
+    stream = run_async(st.session_state.agent.astream(
+        {"messages": [{"role": "user", "content": prompt}]},
+        stream_mode="messages"
+    ))
+    for message, metadata in iter_async(stream):
+        # Only render the top-level model's reply (skip tool calls, tool results and subagents)
+        text = reply_chunk_text(message, metadata)
+        if text:
+            yield text
+
+
+@st.cache_resource(show_spinner=False)
+def _get_llm(model_name: str, temperature: float, top_p: float) -> "ChatTongyi":
+    """Build the chat model once per distinct sampling configuration"""
+    return create_qianwen_model(
+        model_name=model_name,
+        temperature=temperature,
+        top_p=top_p,
+        streaming=True  # Lets the chat render tokens as they arrive
+    )
+
+
+# The model argument is keyed by identity: _get_llm hands out one instance per configuration
+@st.cache_resource(
+    show_spinner=False,
+    hash_funcs={"langchain_community.chat_models.tongyi.ChatTongyi": id}
+)
+def _get_agent(
+    llm: "ChatTongyi",
+    skills_dir: str,
+    state_mode: str,
+    auto_discover: bool,
+    middleware_enabled: bool,
+    verbose: bool
+) -> "SkillAgent":
+    """Build the skill agent once per distinct (model, skill system) configuration"""
+    from AgentSkill import create_skill_agent
+    from config import SkillSystemConfig
+    
+    config = SkillSystemConfig(
+        skills_dir=Path(skills_dir),
+        state_mode=state_mode,
+        auto_discover=auto_discover,
+        verbose=verbose,
+        middleware_enabled=middleware_enabled,
+        filter_by_visibility=True,
+        allowed_visibilities=["public"],
+    )
+    
+    return create_skill_agent(
+        model=llm,
+        config=config,
+        custom_system_prompt="""You are a helpful AI assistant powered by Qianwen (通义千问).
+You have access to various skills that can help users accomplish tasks.
+Use the available skills to provide the best assistance possible.
+Always explain what you're doing and why."""
+    )
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_skill_files(dir_str: str, mtime: float) -> list[str]:
+    """Sorted skill_*.py file names in a directory, cached per directory mtime"""
+    # Single directory scan; DirEntry carries the file type without an extra stat
+    with os.scandir(dir_str) as entries:
+        return sorted(
+            entry.name for entry in entries
+            if entry.name.startswith("skill_") and entry.name.endswith(".py") and entry.is_file()
+        )
+
+
+# Prompts that name their tool outright (e.g. the quick actions):
+# (pattern, registry skill name, tool arguments from the match, reply from the tool result)
+_DIRECT_TOOL_ROUTES = (
+    (
+        re.compile(r"^\s*(?:use the calculator to )?calculate\s+([0-9+\-*/.() ]+?)\s*$", re.IGNORECASE),
+        "calculator",
+        lambda match: {"expression": match.group(1)},
+        lambda match, result: f"{match.group(1)} = {result['result']}",
+    ),
+    (
+        re.compile(r"^\s*(?:what time is it|current time)\s*\??\s*$", re.IGNORECASE),
+        "time_get_current_time",
+        lambda match: {},
+        lambda match, result: f"Current time: {result['time']}",
+    ),
+)
+
+
+def _direct_tool_reply(prompt: str) -> Optional[str]:
+    """Answer a prompt by calling its tool directly, skipping the LLM round trip; None to use the agent"""
+    for pattern, skill_name, make_args, make_reply in _DIRECT_TOOL_ROUTES:
+        match = pattern.match(prompt)
+        if match is None:
+            continue
+        # Only tools this agent was given (visibility / filter_fn applied)
+        tool = st.session_state.agent.get_tool(skill_name)
+        if tool is None:
+            return None
+        try:
+            result = tool.invoke(make_args(match))
+        except Exception:
+            # Includes a lazy tool failing to import; the agent path reports it as a tool message
+            return None
+        # Tool errors go to the agent, which can explain or recover
+        if not isinstance(result, dict) or "error" in result:
+            return None
+        return make_reply(match, result)
+    return None
+
+
+def _send(prompt: str) -> None:
+    """Show a user prompt, stream the agent's reply and record both in the chat history"""
+    st.session_state.messages.append({"role": "user", "content": prompt})
+    with st.chat_message("user"):
+        st.markdown(prompt)
+    
+    reply = _direct_tool_reply(prompt)
+    if reply is not None:
+        with st.chat_message("assistant"):
+            st.markdown(reply)
+        st.session_state.messages.append({"role": "assistant", "content": reply})
+        return
+    
+    with st.chat_message("assistant"):
+        try:
+            # Stream agent response as it is generated
+            response = render_stream(stream_response(prompt))
+            st.session_state.messages.append({"role": "assistant", "content": response})
+        except Exception as e:
+            error_msg = f"Error: {str(e)}"
+            st.error(error_msg)
+            st.session_state.messages.append({"role": "assistant", "content": error_msg})
+            st.exception(e)
+
+
+def _skill_info(agent: "SkillAgent", skill_name: str) -> dict:
+    """Sidebar summary of one skill, with a placeholder when its metadata is unavailable"""
+    meta = agent.get_skill_info(skill_name)
+    if meta is None:
+        return {
+            "name": skill_name,
+            "description": "No description available",
+            "tags": [],
+            "visibility": "unknown"
+        }
+    return {
+        "name": skill_name,
+        "description": meta.description,
+        "tags": meta.tags,
+        "visibility": meta.visibility
+    }
+
+
+@st.cache_data(show_spinner=False)
+def _render_skills_panel(skills_info_json: str) -> str:
+    """Render the sidebar skill cards as one HTML block (metadata is fixed after init)"""
+    cards = []
+    for skill in json.loads(skills_info_json):
+        rows = [f"<b>Description:</b> {html.escape(str(skill['description']))}"]
+        if skill['tags']:
+            rows.append(f"<b>Tags:</b> {html.escape(', '.join(skill['tags']))}")
+        rows.append(f"<b>Visibility:</b> {html.escape(str(skill['visibility']))}")
+        cards.append(
+            f"<details><summary>🔧 {html.escape(skill['name'])}</summary>"
+            f"<p>{'<br>'.join(rows)}</p></details>"
+        )
+    return "".join(cards)
+
+
+# Default number of chat messages kept in session history
+_DEFAULT_HISTORY_WINDOW = 50
+
+
 # Page configuration
 st.set_page_config(
     page_title="Skill Agent - Qianwen",
@@ -64,7 +249,8 @@ st.set_page_config(
 if "agent" not in st.session_state:
     st.session_state.agent = None
 if "messages" not in st.session_state:
-    st.session_state.messages = []
+    # Bounded chat history: only the most recent messages are kept and re-rendered each rerun
+    st.session_state.messages = deque(maxlen=_DEFAULT_HISTORY_WINDOW)
 if "skills_info" not in st.session_state:
     st.session_state.skills_info = []
 
@@ -140,66 +326,35 @@ with st.sidebar:
     # Initialize Agent Button
     st.markdown("---")
     if st.button("🚀 Initialize Agent", use_container_width=True):
-        with st.spinner("Initializing agent..."):
+        # Report progress step by step instead of a single opaque spinner
+        with st.status("Initializing agent...", expanded=True) as status:
             try:
-                # Create model
-                qianwen_model = create_qianwen_model(
-                    model_name=model_name,
-                    temperature=temperature,
-                    top_p=top_p,
-                    streaming=False
-                )
-                
-                # Create config
-                config = SkillSystemConfig(
-                    skills_dir=Path(skills_dir),
-                    state_mode=state_mode,
-                    auto_discover=auto_discover,
-                    verbose=verbose,
-                    middleware_enabled=middleware_enabled,
-                    filter_by_visibility=True,
-                    allowed_visibilities=["public"],
-                )
-                
-                # Create agent
-                agent = create_skill_agent(
-                    model=qianwen_model,
-                    config=config,
-                    custom_system_prompt="""You are a helpful AI assistant powered by Qianwen (通义千问).
-You have access to various skills that can help users accomplish tasks.
-Use the available skills to provide the best assistance possible.
-Always explain what you're doing and why."""
+                status.write("Building model and discovering skills...")
+                # Reuses the live agent when this configuration was built before
+                agent = _get_agent(
+                    _get_llm(model_name, temperature, top_p),
+                    skills_dir, state_mode, auto_discover, middleware_enabled, verbose
                 )
                 
                 st.session_state.agent = agent
-                st.session_state.messages = []
+                st.session_state.messages.clear()
                 
-                # Load skills info
-                skills_list = agent.list_skills()
+                # Load skills info, listing each skill as soon as it is read
                 skills_info = []
-                for skill_name in skills_list:
-                    try:
-                        meta = agent.get_skill_info(skill_name)
-                        skills_info.append({
-                            "name": skill_name,
-                            "description": meta.description,
-                            "tags": meta.tags,
-                            "visibility": meta.visibility
-                        })
-                    except:
-                        skills_info.append({
-                            "name": skill_name,
-                            "description": "No description available",
-                            "tags": [],
-                            "visibility": "unknown"
-                        })
+                for skill_name in agent.list_skills():
+                    skills_info.append(_skill_info(agent, skill_name))
+                    status.write(f"✓ {skill_name}")
                 
                 st.session_state.skills_info = skills_info
                 
-                st.success(f"✅ Agent initialized with {len(skills_list)} skills!")
+                status.update(
+                    label=f"✅ Agent initialized with {len(skills_info)} skills!",
+                    state="complete"
+                )
                 st.rerun()
                 
             except Exception as e:
+                status.update(label="Error initializing agent", state="error")
                 st.error(f"Error initializing agent: {e}")
                 st.exception(e)
     
@@ -209,18 +364,35 @@ Always explain what you're doing and why."""
         st.subheader("Available Skills")
         st.info(f"**{len(st.session_state.skills_info)}** skills loaded")
         
-        # Skills list
-        for skill in st.session_state.skills_info:
-            with st.expander(f"🔧 {skill['name']}"):
-                st.write(f"**Description:** {skill['description']}")
-                if skill['tags']:
-                    st.write(f"**Tags:** {', '.join(skill['tags'])}")
-                st.write(f"**Visibility:** {skill['visibility']}")
+        # Skills list: one pre-rendered element instead of an expander per skill
+        st.markdown(
+            _render_skills_panel(json.dumps(st.session_state.skills_info, sort_keys=True)),
+            unsafe_allow_html=True
+        )
     
-    # Clear Chat Button
+    # Chat Settings
     st.markdown("---")
+    batch_mode = st.checkbox(
+        "Batch Mode",
+        value=False,
+        help="Treat each line of the input as a separate prompt and run them concurrently"
+    )
+    
+    history_window = st.slider(
+        "History Window",
+        min_value=10,
+        max_value=200,
+        value=_DEFAULT_HISTORY_WINDOW,
+        step=10,
+        help="Number of most recent chat messages to keep and display"
+    )
+    if st.session_state.messages.maxlen != history_window:
+        # Shrinking keeps the newest messages
+        st.session_state.messages = deque(st.session_state.messages, maxlen=history_window)
+    
+    # Clear Chat Button
     if st.button("🗑️ Clear Chat", use_container_width=True):
-        st.session_state.messages = []
+        st.session_state.messages.clear()
         st.rerun()
 
 
@@ -243,10 +415,11 @@ if st.session_state.agent is None:
     skills_dir = Path("./skills")
     if skills_dir.exists():
         st.subheader("📁 Available Skill Files")
-        skill_files = list(skills_dir.glob("skill_*.py"))
+        # Directory mtime changes when files are added/removed, invalidating the cached listing
+        skill_files = _list_skill_files(str(skills_dir), skills_dir.stat().st_mtime)
         if skill_files:
             for skill_file in skill_files:
-                st.code(f"skills/{skill_file.name}", language="text")
+                st.code(f"skills/{skill_file}", language="text")
         else:
             st.info("No skill files found. Create skills in the `skills/` directory with pattern `skill_*.py`")
 else:
@@ -256,44 +429,40 @@ else:
             st.markdown(message["content"])
     
     # Chat input
-    if prompt := st.chat_input("Ask a question or request a skill..."):
-        # Add user message to chat
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        with st.chat_message("user"):
-            st.markdown(prompt)
-        
-        # Get agent response
-        with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    # Invoke agent
-                    result = st.session_state.agent.invoke({
-                        "messages": [{"role": "user", "content": prompt}]
-                    })
-                    
-                    # Extract response
-                    if isinstance(result, dict) and "messages" in result:
-                        response = result["messages"][-1].content
-                    else:
-                        response = str(result)
-                    
-                    # Display response
-                    st.markdown(response)
-                    
-                    # Add assistant response to chat
-                    st.session_state.messages.append({"role": "assistant", "content": response})
-                    
-                except Exception as e:
-                    error_msg = f"Error: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
-                    st.exception(e)
+    prompt = st.chat_input("Ask a question or request a skill...")
+    batch_prompts = [line.strip() for line in prompt.splitlines() if line.strip()] if prompt and batch_mode else []
+    
+    if len(batch_prompts) > 1:
+        # Run all prompts concurrently, then render each pair in order
+        results = run_async(st.session_state.agent.abatch(
+            [{"messages": [{"role": "user", "content": p}]} for p in batch_prompts],
+            return_exceptions=True
+        ))
+        for batch_prompt, result in zip(batch_prompts, results):
+            st.session_state.messages.append({"role": "user", "content": batch_prompt})
+            with st.chat_message("user"):
+                st.markdown(batch_prompt)
+            
+            if isinstance(result, Exception):
+                response = f"Error: {str(result)}"
+            elif isinstance(result, dict) and "messages" in result:
+                response = result["messages"][-1].content
+            else:
+                response = str(result)
+            
+            with st.chat_message("assistant"):
+                st.markdown(response)
+            st.session_state.messages.append({"role": "assistant", "content": response})
+    
+    elif prompt:
+        _send(prompt)
     
     # Quick action buttons
     st.markdown("---")
     st.subheader("Quick Actions")
     
     col1, col2, col3, col4 = st.columns(4)
+    quick_prompt = None
     
     with col1:
         if st.button("📋 List Skills"):
@@ -302,13 +471,11 @@ else:
     
     with col2:
         if st.button("🧮 Calculator"):
-            st.session_state.messages.append({"role": "user", "content": "Use the calculator to calculate 25 * 4"})
-            st.rerun()
+            quick_prompt = "Use the calculator to calculate 25 * 4"
     
     with col3:
         if st.button("⏰ Current Time"):
-            st.session_state.messages.append({"role": "user", "content": "What time is it?"})
-            st.rerun()
+            quick_prompt = "What time is it?"
     
     with col4:
         if st.button("ℹ️ Agent Info"):
@@ -320,6 +487,10 @@ else:
             - Middleware: {'Enabled' if middleware_enabled else 'Disabled'}
             """
             st.info(info)
+    
+    # Answer quick actions in place (full width, below the buttons) instead of rerunning the script
+    if quick_prompt:
+        _send(quick_prompt)
 
 # Footer
 st.markdown("---")
@@ -2,6 +2,10 @@
 Calculator Skill
 A simple calculator tool for basic arithmetic operations
 """
+import ast
+import operator as op
+from functools import lru_cache
+from typing import Dict, Union
 from langchain_core.tools import tool
 from core import SkillMetadata
 
@@ -15,8 +19,38 @@ metadata = SkillMetadata(
     author="Skill System"
 )
 
+# Operators the evaluator accepts; any other syntax is rejected
+_OPS = {
+    ast.Add: op.add,
+    ast.Sub: op.sub,
+    ast.Mult: op.mul,
+    ast.Div: op.truediv,
+    ast.FloorDiv: op.floordiv,
+    ast.Pow: op.pow,
+    ast.USub: op.neg,
+    ast.UAdd: op.pos,
+}
+
+
+@lru_cache(maxsize=512)
+def _parse(expression: str) -> ast.expr:
+    """Parse an expression once; repeated expressions reuse the tree"""
+    return ast.parse(expression.strip(), mode="eval").body
+
+
+def _eval(node: ast.expr):
+    """Evaluate a parsed arithmetic expression (numbers and +, -, *, /, //, ** only)"""
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval(node.left), _eval(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval(node.operand))
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    raise ValueError("Only basic arithmetic operations (+, -, *, /) are allowed")
+
+
 @tool
-def calculator(expression: str) -> str:
+def calculator(expression: str) -> Dict[str, Union[int, float, str]]:
     """
     Evaluate a mathematical expression safely
     
@@ -24,21 +58,15 @@ def calculator(expression: str) -> str:
         expression: A mathematical expression (e.g., "2 + 2", "10 * 5", "100 / 4")
     
     Returns:
-        The result of the calculation or an error message
+        {"result": number} on success, or {"error": message}
     """
     try:
-        # Only allow basic arithmetic operations for safety
-        allowed_chars = set("0123456789+-*/.() ")
-        if not all(c in allowed_chars for c in expression):
-            return "Error: Only basic arithmetic operations (+, -, *, /) are allowed"
-        
-        # Evaluate the expression
-        result = eval(expression)
-        return f"Result: {result}"
+        # Walk the parsed tree instead of eval(): only numbers and arithmetic operators are accepted
+        return {"result": _eval(_parse(expression))}
     except ZeroDivisionError:
-        return "Error: Division by zero"
+        return {"error": "Division by zero"}
     except Exception as e:
-        return f"Error: {str(e)}"
+        return {"error": str(e)}
 
 # Export the tool
 tool = calculator
@@ -2,19 +2,29 @@
 Text Processor Skill
 Tools for text manipulation and processing
 """
+import re
+from typing import Dict
 from langchain_core.tools import tool
 from core import SkillMetadata
 
 # Define metadata
 metadata = SkillMetadata(
     name="text_processor",
-    description="Process and manipulate text (uppercase, lowercase, reverse, word count, etc.)",
+    description="Process and manipulate text (uppercase, lowercase, reverse, word count, text stats, etc.)",
     tags=["text", "processing", "utility"],
     visibility="public",
     version="1.0.0",
-    author="Skill System"
+    author="Skill System",
+    cacheable=True
 )
 
+# Runs of non-whitespace, matched without building a list of words
+_WORD_RE = re.compile(r"\S+")
+
+def _word_count(text: str) -> int:
+    """Count whitespace-separated words (same result as len(text.split()))"""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
 @tool
 def text_uppercase(text: str) -> str:
     """Convert text to uppercase"""
@@ -31,18 +41,22 @@ def text_reverse(text: str) -> str:
     return text[::-1]
 
 @tool
-def text_word_count(text: str) -> str:
+def text_word_count(text: str) -> Dict[str, int]:
     """Count words in the text"""
-    words = text.split()
-    return f"Word count: {len(words)}"
+    return {"words": _word_count(text)}
 
 @tool
-def text_character_count(text: str) -> str:
+def text_character_count(text: str) -> Dict[str, int]:
     """Count characters in the text"""
-    return f"Character count: {len(text)}"
+    return {"chars": len(text)}
+
+@tool
+def text_stats(text: str) -> Dict[str, int]:
+    """Count words and characters in the text"""
+    return {"words": _word_count(text), "chars": len(text)}
 
 # Export all tools as a list (registry will handle multiple tools)
-tools = [text_uppercase, text_lowercase, text_reverse, text_word_count, text_character_count]
+tools = [text_uppercase, text_lowercase, text_reverse, text_word_count, text_character_count, text_stats]
 
 # For compatibility, export the first tool as 'tool'
 tool = text_uppercase
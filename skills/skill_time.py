@@ -4,6 +4,8 @@ Get current time and date information
 """
 from langchain_core.tools import tool
 from datetime import datetime
+import time
+from typing import Dict, Union
 from core import SkillMetadata
 
 # Define metadata
@@ -16,24 +18,37 @@ metadata = SkillMetadata(
     author="Skill System"
 )
 
+# Output formats
+_FMT_DT = "%Y-%m-%d %H:%M:%S"
+_FMT_D = "%Y-%m-%d"
+
 @tool
-def get_current_time() -> str:
+def get_current_time() -> Dict[str, str]:
     """Get the current date and time"""
-    now = datetime.now()
-    return f"Current time: {now.strftime('%Y-%m-%d %H:%M:%S')}"
+    return {"time": datetime.now().strftime(_FMT_DT)}
 
 @tool
-def get_current_date() -> str:
+def get_current_date() -> Dict[str, str]:
     """Get the current date"""
-    now = datetime.now()
-    return f"Current date: {now.strftime('%Y-%m-%d')}"
+    return {"date": datetime.now().strftime(_FMT_D)}
 
 @tool
-def get_timestamp() -> str:
+def get_timestamp() -> Dict[str, int]:
     """Get the current Unix timestamp"""
-    timestamp = datetime.now().timestamp()
-    return f"Unix timestamp: {int(timestamp)}"
+    # Integer seconds straight from the clock, no datetime object needed
+    return {"timestamp": time.time_ns() // 1_000_000_000}
+
+@tool
+def get_now() -> Dict[str, Union[str, int]]:
+    """Get the current time, date and Unix timestamp together"""
+    # One clock read serves all three values
+    now = datetime.now()
+    return {
+        "time": now.strftime(_FMT_DT),
+        "date": now.strftime(_FMT_D),
+        "timestamp": int(now.timestamp()),
+    }
 
 # Export tools
-tools = [get_current_time, get_current_date, get_timestamp]
+tools = [get_current_time, get_current_date, get_timestamp, get_now]
 tool = get_current_time
@@ -1,9 +1,15 @@
 """
 Utility functions for Skill System
 """
-from typing import List, Optional
+from typing import Any, AsyncIterable, Awaitable, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import Future
+from functools import lru_cache
+import asyncio
 import logging
+import queue
 import sys
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +21,13 @@ def setup_logger(
     """
     Setup logging configuration
     
+    Replaces any handlers already on the root logger (logging.basicConfig
+    would silently keep them and ignore the new level/format). Hot paths
+    should still skip building messages that would be dropped:
+    
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Tool cache hit: %s", name)
+    
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         format_string: Optional custom format string
@@ -28,58 +41,257 @@ def setup_logger(
     numeric_level = getattr(logging, level.upper(), logging.INFO)
     
     # Configure root logger
-    logging.basicConfig(
-        level=numeric_level,
-        format=format_string,
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(format_string))
+    root.addHandler(handler)
+    root.setLevel(numeric_level)
     
     logger.info(f"Logger configured with level: {level}")
 
 
+# Tool calls issued in the same model turn are executed concurrently by the
+# agent's tool node, so independent calls should be batched into one turn
+PARALLEL_TOOL_CALLS_PROMPT = """When several tool calls do not depend on each other's results, issue them together
+in a single response so they run in parallel. Only wait for a tool result before
+calling another tool when that later call needs the result.
+"""
+
+
+_PROMPT_HEADER = """You are a helpful AI assistant with access to various skills and tools.
+
+You can use the following skills to help users:
+"""
+
+_PROMPT_INSTRUCTIONS = """When a user asks you to do something:
+1. Determine which skill(s) would be most appropriate
+2. Use the skill(s) to accomplish the task
+3. Provide a clear explanation of what you did
+
+If you're unsure which skill to use, you can try multiple skills or ask the user for clarification.
+"""
+
+
 def generate_system_prompt(
     available_skill_names: List[str],
-    custom_instructions: str = ""
+    custom_instructions: str = "",
+    parallel_tool_calls: bool = False
 ) -> str:
     """
     Generate system prompt for the agent
     
+    Results are cached by (sorted skill names, custom_instructions,
+    parallel_tool_calls); call generate_system_prompt.cache_clear() to reset.
+    
     Args:
         available_skill_names: List of available skill names
         custom_instructions: Custom instructions to append
+        parallel_tool_calls: Whether to instruct the model to batch independent tool calls
     
     Returns:
         System prompt string
     """
-    base_prompt = """You are a helpful AI assistant with access to various skills and tools.
+    return _build_system_prompt(
+        tuple(sorted(available_skill_names)),
+        custom_instructions,
+        parallel_tool_calls
+    )
 
-You can use the following skills to help users:
-"""
-    
-    # Add skill list
+
+@lru_cache(maxsize=64)
+def _build_system_prompt(
+    available_skill_names: Tuple[str, ...],
+    custom_instructions: str,
+    parallel_tool_calls: bool
+) -> str:
+    """Build the system prompt (cached, see generate_system_prompt)"""
+    # Each section is built once and the prompt is assembled in a single join
     if available_skill_names:
-        skill_list = "\n".join(
-            f"- {skill_name}" for skill_name in available_skill_names
-        )
-        base_prompt += skill_list + "\n\n"
+        skill_section = "\n".join(f"- {skill_name}" for skill_name in available_skill_names) + "\n\n"
     else:
-        base_prompt += "No skills are currently available.\n\n"
+        skill_section = "No skills are currently available.\n\n"
     
-    base_prompt += """When a user asks you to do something:
-1. Determine which skill(s) would be most appropriate
-2. Use the skill(s) to accomplish the task
-3. Provide a clear explanation of what you did
-
-If you're unsure which skill to use, you can try multiple skills or ask the user for clarification.
-"""
+    sections = [_PROMPT_HEADER, skill_section, _PROMPT_INSTRUCTIONS]
+    
+    if parallel_tool_calls:
+        sections.append("\n" + PARALLEL_TOOL_CALLS_PROMPT)
     
     # Add custom instructions
     if custom_instructions:
-        base_prompt += f"\n\nAdditional instructions:\n{custom_instructions}\n"
+        sections.append(f"\n\nAdditional instructions:\n{custom_instructions}\n")
+    
+    return "".join(sections)
+
+
+generate_system_prompt.cache_clear = _build_system_prompt.cache_clear
+
+
+class BatchingAgentProxy:
+    """
+    Coalesces concurrent invoke() calls into one batch() call on the wrapped agent
+    
+    The first queued call opens a window of `window` seconds; every call that
+    arrives before it closes (up to `max_batch_size`) is sent in the same
+    agent.batch(). Each caller blocks until its own result is ready, and an
+    exception raised for one input is re-raised only in that input's caller.
+    """
+    
+    def __init__(self, agent: Any, window: float = 0.2, max_batch_size: int = 16):
+        """
+        Args:
+            agent: Runnable exposing batch(inputs, return_exceptions=True)
+            window: Seconds to wait for more calls after the first one arrives
+            max_batch_size: Maximum number of inputs sent in one batch
+        """
+        self.agent = agent
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+    
+    def invoke(self, input_data: Any, timeout: Optional[float] = None) -> Any:
+        """Queue one input and wait for its result from the next batch"""
+        future: Future = Future()
+        self._queue.put((input_data, future))
+        if self._worker is None:
+            self._start_worker()
+        return future.result(timeout)
+    
+    def _start_worker(self) -> None:
+        """Start the background batching thread (once)"""
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="agent-batcher", daemon=True
+                )
+                self._worker.start()
+    
+    def _next_batch(self) -> List[Tuple[Any, Future]]:
+        """Block for the first call, then collect more until the window closes or the batch is full"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self) -> None:
+        """Worker loop: send each collected batch and hand results back to the callers"""
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self.agent.batch([item for item, _ in batch], return_exceptions=True)
+            except Exception as e:
+                results = [e] * len(batch)
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"BatchingAgentProxy: sent batch of {len(batch)}")
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+# Shared background event loop for sync callers (e.g. Streamlit script threads);
+# started on first use so importing this module does not spawn a thread
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared event loop, starting its thread on first call"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async-runner", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine on the shared background loop and wait for its result
+    
+    Unlike asyncio.run(), the loop persists between calls, so concurrent
+    callers (one per Streamlit session) overlap their awaits on one loop and
+    async clients bound to it stay usable.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+
+def iter_async(aiterable: AsyncIterable[Any]) -> Iterator[Any]:
+    """Iterate an async iterable from sync code, advancing it on the shared loop"""
+    aiterator = aiterable.__aiter__()
+    
+    async def next_item():
+        try:
+            return True, await aiterator.__anext__()
+        except StopAsyncIteration:
+            return False, None
+    
+    while True:
+        has_item, item = run_async(next_item())
+        if not has_item:
+            return
+        yield item
+
+
+def reply_chunk_text(message: Any, metadata: dict) -> str:
+    """
+    Text of a ``stream_mode="messages"`` chunk if it belongs to the user-facing reply, else ""
+    
+    Keeps only content streamed by the top-level model node: chunks from
+    subagents and other nested graphs (whose checkpoint namespace is nested)
+    and chunks that carry tool-call arguments are dropped, as are tool results.
+    """
+    from langchain_core.messages import AIMessage  # Only the chat front-ends call this
+    
+    if not isinstance(message, AIMessage) or getattr(message, "tool_call_chunks", None):
+        return ""
+    if metadata.get("langgraph_node") != "model" or "|" in metadata.get("langgraph_checkpoint_ns", ""):
+        return ""
+    content = message.content
+    return content if isinstance(content, str) else ""
+
+
+def render_stream(chunks: Iterable[str]) -> str:
+    """
+    Render streamed text into the current Streamlit container and return the full text
+    
+    Shows the reply as plain text while chunks arrive and renders it as
+    Markdown once at the end, instead of re-parsing the growing reply as
+    Markdown on every chunk (as st.write_stream does).
+    """
+    import streamlit as st  # Only the Streamlit UIs call this
     
-    return base_prompt
+    placeholder = st.empty()
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        placeholder.text("".join(parts))
+    response = "".join(parts)
+    placeholder.markdown(response)
+    return response
 
 
-__all__ = ["setup_logger", "generate_system_prompt"]
+__all__ = [
+    "setup_logger",
+    "generate_system_prompt",
+    "PARALLEL_TOOL_CALLS_PROMPT",
+    "BatchingAgentProxy",
+    "run_async",
+    "iter_async",
+    "reply_chunk_text",
+    "render_stream",
+]